@@ -0,0 +1,72 @@
+"""Micro-benchmark: per-request cost of building the ``/`` and ``/me`` bodies.
+
+Compares the old path (build a dict, serialize it through ``JSONResponse``)
+with the pre-encoded fast path in ``responses.py``.
+
+Run from the ``stage-0`` folder:
+
+    python benchmarks/bench_responses.py [-n 200000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse, Response  # noqa: E402
+
+import responses  # noqa: E402
+from config import EMAIL, NAME, STACK  # noqa: E402
+from main import utc_iso_now  # noqa: E402
+
+FACT = "Cats sleep for around 13 to 16 hours a day (70 percent of their life)."
+
+
+def welcome_dict():
+    payload = {"status": "success", "details": " Welcome to my first HNG13 Task 0"}
+    return JSONResponse(content=payload, status_code=200, media_type="application/json")
+
+
+def welcome_bytes():
+    return Response(content=responses.WELCOME_BODY, status_code=200, media_type="application/json")
+
+
+def me_dict():
+    payload = {
+        "status": "success",
+        "user": {"email": EMAIL, "name": NAME, "stack": STACK},
+        "timestamp": utc_iso_now(),
+        "fact": FACT,
+    }
+    return JSONResponse(content=payload, status_code=200, media_type="application/json")
+
+
+def me_bytes():
+    body = responses.me_body(utc_iso_now(), FACT)
+    return Response(content=body, status_code=200, media_type="application/json")
+
+
+def bench(fn, number):
+    best = min(timeit.repeat(fn, number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=200_000, help="calls per timing run")
+    args = parser.parse_args()
+
+    assert welcome_dict().body == welcome_bytes().body
+    encoder = "orjson" if "orjson" in sys.modules else "json"
+    print(f"encoder: {encoder}, {args.number} calls per run, best of 5\n")
+    print(f"{'endpoint':<10}{'dict+JSONResponse':>20}{'pre-encoded':>15}{'saved':>12}")
+    for name, old, new in (("/", welcome_dict, welcome_bytes), ("/me", me_dict, me_bytes)):
+        old_us = bench(old, args.number)
+        new_us = bench(new, args.number)
+        saved = (1 - new_us / old_us) * 100
+        print(f"{name:<10}{old_us:>17.2f} us{new_us:>12.2f} us{saved:>11.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Offline load test for stage-0 with a local Cat Facts stub.
+
+Starts a stub HTTP server that stands in for ``CATFACT_URL`` (with
+configurable latency, jitter and error rate), runs the app under uvicorn in a
+subprocess pointed at the stub, then drives it with concurrent clients and
+reports RPS and p50/p95/p99 latency.
+
+Run from the ``stage-0`` folder:
+
+    python benchmarks/loadtest.py --concurrency 100 --duration 15 \\
+        --stub-latency-ms 200 --stub-error-rate 0.1
+
+Any extra app settings (``FACT_BUFFER_SIZE``, ``CATFACT_MAX_CONCURRENCY``,
+...) are read from the environment as usual. Use ``--max-p99-ms`` to make the
+run exit non-zero when p99 regresses past a threshold.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+STAGE0_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CatFactStub:
+    """Minimal keep-alive HTTP/1.1 server answering every GET with a fact."""
+
+    def __init__(self, latency_ms, jitter_ms, error_rate):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._server = None
+
+    async def start(self, host="127.0.0.1"):
+        self._server = await asyncio.start_server(self._handle, host, 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                # Drain headers; the stub never expects a request body.
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self.requests += 1
+                delay = self.latency + random.uniform(0, self.jitter)
+                if delay:
+                    await asyncio.sleep(delay)
+                if random.random() < self.error_rate:
+                    self.errors += 1
+                    status, body = "500 Internal Server Error", b'{"error":"stub failure"}'
+                else:
+                    fact = f"Stub cat fact #{self.requests}."
+                    status, body = "200 OK", json.dumps({"fact": fact, "length": len(fact)}).encode()
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_up(client, url, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get(url)
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"app did not start at {url}")
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def drive(client, url, concurrency, duration, warmup):
+    latencies = []
+    statuses = {}
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    async def worker():
+        while True:
+            sent = time.perf_counter()
+            if sent >= stop_at:
+                return
+            try:
+                resp = await client.get(url)
+                key = str(resp.status_code)
+            except httpx.HTTPError as exc:
+                key = type(exc).__name__
+            if sent >= measure_from:
+                latencies.append(time.perf_counter() - sent)
+                statuses[key] = statuses.get(key, 0) + 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - measure_from
+
+
+async def run(args):
+    stub = CatFactStub(args.stub_latency_ms, args.stub_jitter_ms, args.stub_error_rate)
+    stub_port = await stub.start()
+    app_port = free_port()
+
+    env = dict(os.environ, CATFACT_URL=f"http://127.0.0.1:{stub_port}/fact")
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(app_port), "--log-level", "warning"],
+        cwd=STAGE0_DIR, env=env,
+    )
+    base = f"http://127.0.0.1:{app_port}"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+            await wait_until_up(client, base + "/")
+            latencies, statuses, elapsed = await drive(
+                client, base + args.path, args.concurrency, args.duration, args.warmup
+            )
+            try:
+                app_metrics = (await client.get(base + "/metrics")).json()
+            except (httpx.HTTPError, ValueError):
+                app_metrics = None
+    finally:
+        app.terminate()
+        app.wait(timeout=10)
+        await stub.stop()
+
+    latencies.sort()
+    report = {
+        "path": args.path,
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            name: round(percentile(latencies, pct) * 1000, 2)
+            for name, pct in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))
+        },
+        "statuses": statuses,
+        "stub": {
+            "latency_ms": args.stub_latency_ms,
+            "jitter_ms": args.stub_jitter_ms,
+            "error_rate": args.stub_error_rate,
+            "requests": stub.requests,
+            "errors": stub.errors,
+        },
+        "app_metrics": app_metrics,
+    }
+    return report
+
+
+def print_report(report):
+    lat = report["latency_ms"]
+    stub = report["stub"]
+    print(f"GET {report['path']}  concurrency={report['concurrency']}  duration={report['duration_s']}s")
+    print(f"  requests: {report['requests']}  rps: {report['rps']}  statuses: {report['statuses']}")
+    print(f"  latency ms: p50={lat['p50']}  p95={lat['p95']}  p99={lat['p99']}  max={lat['max']}")
+    print(f"  stub: {stub['requests']} upstream calls, {stub['errors']} injected errors "
+          f"(latency={stub['latency_ms']}ms, jitter={stub['jitter_ms']}ms, error_rate={stub['error_rate']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="/me")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before measuring")
+    parser.add_argument("--timeout", type=float, default=30.0, help="client timeout in seconds")
+    parser.add_argument("--stub-latency-ms", type=float, default=100.0)
+    parser.add_argument("--stub-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    parser.add_argument("--max-p99-ms", type=float, help="exit 1 if p99 latency exceeds this")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    if args.max_p99_ms is not None and report["latency_ms"]["p99"] > args.max_p99_ms:
+        print(f"p99 {report['latency_ms']['p99']}ms exceeds budget {args.max_p99_ms}ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Minimal circuit breaker for a single upstream dependency."""
+import logging
+import time
+
+logger = logging.getLogger("stage0.breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures.
+
+    While open every call is rejected until ``reset_timeout`` seconds have
+    passed; the breaker then goes half-open and lets up to
+    ``half_open_max_calls`` trial calls through. A trial success closes it
+    again, a trial failure re-opens it.
+    """
+
+    def __init__(self, name, failure_threshold, reset_timeout, half_open_max_calls=1, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._half_open_calls = 0
+        self.stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def _transition(self, state):
+        if state == self.state:
+            return
+        logger.warning("Circuit %s: %s -> %s", self.name, self.state, state)
+        self.state = state
+        if state == OPEN:
+            self.opened_at = self._clock()
+            self.stats["opened"] += 1
+        elif state == HALF_OPEN:
+            self._half_open_calls = 0
+        elif state == CLOSED:
+            self.opened_at = None
+            self.consecutive_failures = 0
+
+    def allow(self):
+        """Return True if a call may go to the upstream now."""
+        if self.state == OPEN and self._clock() - self.opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+        self.stats["rejected"] += 1
+        return False
+
+    def record_success(self):
+        self.stats["successes"] += 1
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            self._transition(CLOSED)
+
+    def record_failure(self):
+        self.stats["failures"] += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._transition(OPEN)
+
+    def snapshot(self):
+        """Return the breaker state as a JSON-serializable dict."""
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(max(0.0, self.reset_timeout - (self._clock() - self.opened_at)), 3)
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout": self.reset_timeout,
+            "retry_in_seconds": retry_in,
+            **self.stats,
+        }
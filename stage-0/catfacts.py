@@ -0,0 +1,122 @@
+"""Upstream calls to the Cat Facts API.
+
+Every call goes through a limiter so that at most ``CATFACT_MAX_CONCURRENCY``
+requests are in flight, however much inbound load arrives. Latency-sensitive
+callers use ``fetch_shared`` which coalesces concurrent callers onto the
+fetches already in flight (single-flight) instead of queueing new ones.
+
+Calls are also guarded by a circuit breaker and bounded by
+``CATFACT_LATENCY_BUDGET``; while the breaker is open they fail fast and the
+caller falls back without touching the upstream.
+"""
+import asyncio
+import logging
+
+import config
+import upstream
+from breaker import CircuitBreaker
+
+logger = logging.getLogger("stage0.catfacts")
+
+breaker = CircuitBreaker(
+    "catfacts",
+    failure_threshold=config.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=config.BREAKER_RESET_TIMEOUT,
+    half_open_max_calls=config.BREAKER_HALF_OPEN_MAX_CALLS,
+)
+_limiter = asyncio.Semaphore(config.CATFACT_MAX_CONCURRENCY)
+_shared = {}  # in-flight shared task -> number of callers awaiting it
+_stats = {
+    "upstream_in_flight": 0,
+    "peak_upstream_in_flight": 0,
+    "shared_fetches": 0,
+    "coalesced_callers": 0,
+    "budget_exceeded": 0,
+}
+
+
+async def _fetch_once():
+    try:
+        resp = await asyncio.wait_for(
+            upstream.get(config.CATFACT_URL), timeout=config.CATFACT_LATENCY_BUDGET
+        )
+    except asyncio.TimeoutError:
+        _stats["budget_exceeded"] += 1
+        logger.warning("Cat Facts API exceeded latency budget of %ss", config.CATFACT_LATENCY_BUDGET)
+        return None
+    except Exception as exc:
+        logger.warning("Failed to fetch cat fact: %s", exc)
+        return None
+    if resp.status_code != 200:
+        logger.warning("Cat Facts API returned status %s", resp.status_code)
+        return None
+    try:
+        data = resp.json()
+    except ValueError as exc:
+        logger.warning("Cat Facts API returned invalid JSON: %s", exc)
+        return None
+    fact = data.get("fact") if isinstance(data, dict) else None
+    logger.debug("Cat Facts API response: %s", fact)
+    return fact or None
+
+
+async def fetch_fact():
+    """Fetch one fresh fact from ``CATFACT_URL``. Return the fact text or None."""
+    async with _limiter:
+        # Checked after queueing on the limiter so that calls waiting behind a
+        # failing one fail fast once the breaker opens.
+        if not breaker.allow():
+            return None
+        fact = None
+        _stats["upstream_in_flight"] += 1
+        _stats["peak_upstream_in_flight"] = max(
+            _stats["peak_upstream_in_flight"], _stats["upstream_in_flight"]
+        )
+        try:
+            fact = await _fetch_once()
+        finally:
+            _stats["upstream_in_flight"] -= 1
+            # Always settle the breaker, even when cancelled, so a half-open
+            # trial slot is never leaked.
+            if fact is None:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+    return fact
+
+
+async def fetch_shared():
+    """Fetch a fact, sharing the result with concurrent callers.
+
+    A new upstream fetch is started only while fewer than
+    ``CATFACT_MAX_CONCURRENCY`` shared fetches are in flight; otherwise the
+    caller awaits the in-flight fetch with the fewest waiters.
+    """
+    if len(_shared) < config.CATFACT_MAX_CONCURRENCY:
+        task = asyncio.ensure_future(fetch_fact())
+        _shared[task] = 0
+        task.add_done_callback(lambda t: _shared.pop(t, None))
+        _stats["shared_fetches"] += 1
+    else:
+        task = min(_shared, key=_shared.get)
+        _stats["coalesced_callers"] += 1
+    _shared[task] += 1
+    try:
+        # Shield so one cancelled request does not cancel the fetch for everyone.
+        return await asyncio.shield(task)
+    finally:
+        if task in _shared:
+            _shared[task] -= 1
+
+
+def coalesce_metrics():
+    """Return a snapshot of upstream concurrency and coalescing."""
+    return {
+        "max_concurrency": config.CATFACT_MAX_CONCURRENCY,
+        "upstream_in_flight": _stats["upstream_in_flight"],
+        "peak_upstream_in_flight": _stats["peak_upstream_in_flight"],
+        "shared_in_flight": len(_shared),
+        "shared_fetches": _stats["shared_fetches"],
+        "coalesced_callers": _stats["coalesced_callers"],
+        "budget_exceeded": _stats["budget_exceeded"],
+    }
@@ -0,0 +1,36 @@
+import os
+
+# Configuration via environment variables with sensible defaults.
+EMAIL = os.getenv("PROFILE_EMAIL", "dzokotosolomon85@gmail.com")
+NAME = os.getenv("PROFILE_NAME", "Solomon Dzokoto")
+STACK = os.getenv("PROFILE_STACK", "Python/FastAPI")
+CATFACT_URL = os.getenv("CATFACT_URL", "https://catfact.ninja/fact")
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "5.0"))
+
+# Shared upstream connection pool.
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30.0"))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "1.0"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Background-prefetched cat-fact buffer.
+FACT_BUFFER_SIZE = int(os.getenv("FACT_BUFFER_SIZE", "64"))
+FACT_BUFFER_LOW_WATERMARK = int(os.getenv("FACT_BUFFER_LOW_WATERMARK", "16"))
+FACT_REFILL_BATCH = int(os.getenv("FACT_REFILL_BATCH", "8"))
+FACT_REFILL_INTERVAL = float(os.getenv("FACT_REFILL_INTERVAL", "5.0"))
+FACT_REFILL_BACKOFF = float(os.getenv("FACT_REFILL_BACKOFF", "2.0"))
+
+# Upper bound on concurrent upstream fetches; extra callers share in-flight results.
+CATFACT_MAX_CONCURRENCY = max(1, int(os.getenv("CATFACT_MAX_CONCURRENCY", "1")))
+
+# Circuit breaker and latency budget for the Cat Facts API.
+CATFACT_LATENCY_BUDGET = float(os.getenv("CATFACT_LATENCY_BUDGET", "1.0"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30.0"))
+BREAKER_HALF_OPEN_MAX_CALLS = int(os.getenv("BREAKER_HALF_OPEN_MAX_CALLS", "1"))
+
+# Warm-start snapshot of recently fetched facts. Set FACT_CACHE_PATH="" to disable.
+FACT_CACHE_PATH = os.getenv("FACT_CACHE_PATH", ".fact_cache.json")
+FACT_CACHE_SIZE = int(os.getenv("FACT_CACHE_SIZE", str(FACT_BUFFER_SIZE)))
+FACT_CACHE_INTERVAL = float(os.getenv("FACT_CACHE_INTERVAL", "60.0"))
@@ -0,0 +1,202 @@
+"""Bounded ring buffer of cat facts kept full by a background task.
+
+``/me`` takes facts from memory and never waits on the upstream. A single
+refill task tops the buffer up in batches whenever it drops below the low
+watermark, publishing each fact as soon as its fetch completes; if the buffer
+runs dry the last good fact is served instead. Only a cold process with no
+fact yet waits: on the first refill fetch to complete when a refill is in
+flight, otherwise on a coalesced upstream fetch.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+
+import catfacts
+import config
+
+logger = logging.getLogger("stage0.fact_buffer")
+
+_buffer = deque(maxlen=config.FACT_BUFFER_SIZE)
+_recent = deque(maxlen=config.FACT_CACHE_SIZE)  # recently fetched, for warm starts
+_last_fact = None
+_task = None
+_refill_fetches = set()  # in-flight refill fetches, which cold callers join
+_wakeup = None
+_stats = {
+    "served_buffer": 0,
+    "served_last_good": 0,
+    "served_empty": 0,
+    "refills": 0,
+    "refill_failures": 0,
+    "last_refill_seconds": 0.0,
+    "max_refill_seconds": 0.0,
+    "total_refill_seconds": 0.0,
+}
+
+
+def take():
+    """Return a fact without blocking: buffered, else last good, else None."""
+    global _last_fact
+    if _buffer:
+        _last_fact = _buffer.popleft()
+        _stats["served_buffer"] += 1
+        fact = _last_fact
+    elif _last_fact is not None:
+        _stats["served_last_good"] += 1
+        fact = _last_fact
+    else:
+        _stats["served_empty"] += 1
+        fact = None
+    if len(_buffer) < config.FACT_BUFFER_LOW_WATERMARK and _wakeup is not None:
+        _wakeup.set()
+    return fact
+
+
+async def take_or_fetch():
+    """Like ``take`` but, before any fact has been seen, wait for a shared fetch.
+
+    Only a cold process ever waits. If a refill is in flight its fetches
+    already hold the upstream limiter, so the caller waits for the first of
+    them to publish a fact rather than queueing a new fetch behind the whole
+    batch. Otherwise concurrent cold callers are coalesced onto the same
+    upstream fetch.
+    """
+    global _last_fact
+    if not _buffer and _last_fact is None:
+        await _join_refill()
+    fact = take()
+    if fact is None:
+        fact = await catfacts.fetch_shared()
+        if fact and _last_fact is None:
+            _last_fact = fact
+            _recent.append(fact)
+    return fact
+
+
+async def _join_refill():
+    """Wait on in-flight refill fetches until one publishes a fact or all are done."""
+    pending = set(_refill_fetches)
+    while pending and not _buffer and _last_fact is None:
+        _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+
+def _publish(fact):
+    global _last_fact
+    _buffer.append(fact)
+    _recent.append(fact)
+    if _last_fact is None:
+        _last_fact = fact
+
+
+async def _fetch_and_publish():
+    fact = await catfacts.fetch_fact()
+    if fact:
+        _publish(fact)
+    return fact
+
+
+def preload(facts):
+    """Seed the buffer with previously fetched facts (e.g. from disk)."""
+    global _last_fact
+    facts = list(facts)
+    _buffer.extend(facts)
+    _recent.extend(facts)
+    if facts and _last_fact is None:
+        _last_fact = facts[-1]
+
+
+def recent_facts():
+    """Return the most recently fetched facts, oldest first."""
+    return list(_recent)
+
+
+async def refill():
+    """Fetch one batch of facts concurrently, appending each to the buffer as
+    it arrives.
+
+    Return the number of facts added.
+    """
+    want = min(config.FACT_REFILL_BATCH, _buffer.maxlen - len(_buffer))
+    if want <= 0:
+        return 0
+    started = time.perf_counter()
+    fetches = [asyncio.ensure_future(_fetch_and_publish()) for _ in range(want)]
+    _refill_fetches.update(fetches)
+    try:
+        results = await asyncio.gather(*fetches)
+    finally:
+        _refill_fetches.difference_update(fetches)
+    elapsed = time.perf_counter() - started
+
+    facts = [fact for fact in results if fact]
+
+    _stats["refills"] += 1
+    _stats["last_refill_seconds"] = elapsed
+    _stats["max_refill_seconds"] = max(_stats["max_refill_seconds"], elapsed)
+    _stats["total_refill_seconds"] += elapsed
+    if not facts:
+        _stats["refill_failures"] += 1
+    return len(facts)
+
+
+async def _refill_loop():
+    while True:
+        if len(_buffer) < config.FACT_BUFFER_LOW_WATERMARK:
+            # Top up to capacity once the low watermark has been crossed.
+            while len(_buffer) < _buffer.maxlen:
+                if await refill() == 0:
+                    await asyncio.sleep(config.FACT_REFILL_BACKOFF)
+                    break
+            continue
+        _wakeup.clear()
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=config.FACT_REFILL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def start():
+    """Start the background refill task. Called from the app lifespan."""
+    global _task, _wakeup
+    if _task is not None:
+        return
+    _wakeup = asyncio.Event()
+    _task = asyncio.create_task(_refill_loop())
+    logger.info(
+        "Fact buffer started (size=%s, low_watermark=%s, batch=%s)",
+        _buffer.maxlen, config.FACT_BUFFER_LOW_WATERMARK, config.FACT_REFILL_BATCH,
+    )
+
+
+async def stop():
+    """Cancel the background refill task."""
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
+
+
+def buffer_metrics():
+    """Return a snapshot of buffer depth and refill latency."""
+    refills = _stats["refills"]
+    return {
+        "depth": len(_buffer),
+        "capacity": _buffer.maxlen,
+        "low_watermark": config.FACT_BUFFER_LOW_WATERMARK,
+        "refills": refills,
+        "refill_failures": _stats["refill_failures"],
+        "last_refill_ms": round(_stats["last_refill_seconds"] * 1000, 2),
+        "max_refill_ms": round(_stats["max_refill_seconds"] * 1000, 2),
+        "avg_refill_ms": round(_stats["total_refill_seconds"] * 1000 / refills, 2) if refills else 0.0,
+        "served": {
+            "buffer": _stats["served_buffer"],
+            "last_good": _stats["served_last_good"],
+            "empty": _stats["served_empty"],
+        },
+    }
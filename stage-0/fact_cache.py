@@ -0,0 +1,119 @@
+"""Persistent warm-start cache for the fact buffer.
+
+Recently fetched facts are snapshotted to ``FACT_CACHE_PATH`` every
+``FACT_CACHE_INTERVAL`` seconds and on shutdown. Writes go to a temporary
+file that is then renamed over the snapshot, so a crash never leaves a
+half-written file. On startup the snapshot is loaded into the buffer and a
+fresh process can serve facts without an upstream round trip.
+"""
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime, timezone
+
+import config
+import fact_buffer
+
+logger = logging.getLogger("stage0.fact_cache")
+
+_FORMAT_VERSION = 1
+
+_task = None
+_stats = {"loaded": 0, "saves": 0, "save_failures": 0, "last_saved_at": None}
+
+
+def load(path):
+    """Return the facts stored at ``path``, or an empty list."""
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring unreadable fact cache %s: %s", path, exc)
+        return []
+    if not isinstance(data, dict) or data.get("version") != _FORMAT_VERSION:
+        logger.warning("Ignoring fact cache %s with unknown format", path)
+        return []
+    return [fact for fact in data.get("facts", []) if isinstance(fact, str) and fact]
+
+
+def save(path, facts):
+    """Atomically write ``facts`` to ``path``."""
+    payload = {
+        "version": _FORMAT_VERSION,
+        "saved_at": datetime.now(timezone.utc).isoformat(),
+        "facts": list(facts),
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".fact_cache.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, ensure_ascii=False)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+async def _save_now():
+    facts = fact_buffer.recent_facts()
+    if not facts:
+        return
+    try:
+        await asyncio.to_thread(save, config.FACT_CACHE_PATH, facts)
+    except OSError as exc:
+        _stats["save_failures"] += 1
+        logger.warning("Failed to write fact cache %s: %s", config.FACT_CACHE_PATH, exc)
+        return
+    _stats["saves"] += 1
+    _stats["last_saved_at"] = datetime.now(timezone.utc).isoformat()
+
+
+async def _save_loop():
+    while True:
+        await asyncio.sleep(config.FACT_CACHE_INTERVAL)
+        await _save_now()
+
+
+async def start():
+    """Warm the fact buffer from disk and start periodic snapshots."""
+    global _task
+    if not config.FACT_CACHE_PATH or _task is not None:
+        return
+    facts = load(config.FACT_CACHE_PATH)
+    if facts:
+        fact_buffer.preload(facts)
+        _stats["loaded"] = len(facts)
+        logger.info("Warm-started fact buffer with %s cached facts", len(facts))
+    _task = asyncio.create_task(_save_loop())
+
+
+async def stop():
+    """Stop periodic snapshots and write a final one."""
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
+    await _save_now()
+
+
+def cache_metrics():
+    """Return a snapshot of warm-start cache activity."""
+    return {
+        "enabled": bool(config.FACT_CACHE_PATH),
+        "path": config.FACT_CACHE_PATH or None,
+        **_stats,
+    }
@@ -1,12 +1,32 @@
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
-import httpx
-import os
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 import logging
 
-app = FastAPI(title="Stage 0 - Profile API")
+import catfacts
+import fact_buffer
+import fact_cache
+import responses
+import upstream
+from config import CATFACT_URL, CATFACT_LATENCY_BUDGET
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await upstream.start()
+    await fact_cache.start()
+    await fact_buffer.start()
+    try:
+        yield
+    finally:
+        await fact_buffer.stop()
+        await fact_cache.stop()
+        await upstream.close()
+
+
+app = FastAPI(title="Stage 0 - Profile API", lifespan=lifespan)
 
 
 app.add_middleware(
@@ -20,12 +40,7 @@ app.add_middleware(
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("stage0")
 
-# Configuration via environment variables with sensible defaults.
-EMAIL = os.getenv("PROFILE_EMAIL", "dzokotosolomon85@gmail.com")
-NAME = os.getenv("PROFILE_NAME", "Solomon Dzokoto")
-STACK = os.getenv("PROFILE_STACK", "Python/FastAPI")
-CATFACT_URL = os.getenv("CATFACT_URL", "https://catfact.ninja/fact")
-HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "5.0"))
+FALLBACK_FACT = "Cat fact could not be retrieved at this time."
 
 
 def utc_iso_now():
@@ -35,42 +50,39 @@ def utc_iso_now():
 
 @app.get("/")
 async def welcome():
-    payload = {
-        "status": "success",
-         "details" : " Welcome to my first HNG13 Task 0"
-    }
-    return JSONResponse(content=payload, status_code=200, media_type="application/json")
+    return Response(content=responses.WELCOME_BODY, status_code=200, media_type="application/json")
 
 @app.get("/me")
 async def me():
-    """Return profile information plus a dynamic cat fact fetched from an external API."""
-    fact = "Cat fact could not be retrieved at this time."
-    try:
-        timeout = httpx.Timeout(HTTP_TIMEOUT)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            resp = await client.get(CATFACT_URL)
-            if resp.status_code == 200:
-                data = resp.json()
-                logger.info("Cat Facts API response: %s", data)
-                fact = data.get("fact", fact)
-            else:
-                logger.warning("Cat Facts API returned status %s", resp.status_code)
-    except Exception as exc:
-        logger.exception("Failed to fetch cat fact: %s", exc)
-
-    payload = {
+    """Return profile information plus a cat fact served from the prefetch buffer."""
+    fact = await fact_buffer.take_or_fetch() or FALLBACK_FACT
+    body = responses.me_body(utc_iso_now(), fact)
+    return Response(content=body, status_code=200, media_type="application/json")
+
+
+@app.get("/metrics")
+async def metrics():
+    """Return runtime metrics for the upstream pool, fetches, fact buffer and warm-start cache."""
+    return {
+        "http_pool": upstream.pool_metrics(),
+        "catfacts": catfacts.coalesce_metrics(),
+        "fact_buffer": fact_buffer.buffer_metrics(),
+        "fact_cache": fact_cache.cache_metrics(),
+    }
+
+
+@app.get("/status")
+async def status():
+    """Return the health of upstream dependencies, including the circuit breaker."""
+    return {
         "status": "success",
-        "user": {
-            "email": EMAIL,
-            "name": NAME,
-            "stack": STACK,
+        "catfacts": {
+            "url": CATFACT_URL,
+            "latency_budget_seconds": CATFACT_LATENCY_BUDGET,
+            "breaker": catfacts.breaker.snapshot(),
         },
-        "timestamp": utc_iso_now(),
-        "fact": fact,
     }
 
-    return JSONResponse(content=payload, status_code=200, media_type="application/json")
-
 
 if __name__ == "__main__":
 
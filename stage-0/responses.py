@@ -0,0 +1,41 @@
+"""Pre-encoded JSON bodies for the profile endpoints.
+
+Everything that is fixed at import time (status, welcome text, the profile
+block) is encoded to bytes once. Per request only the timestamp and the fact
+are encoded and spliced in. ``orjson`` is used when installed, otherwise the
+stdlib encoder with the same compact settings as ``JSONResponse``.
+"""
+import json
+
+from config import EMAIL, NAME, STACK
+
+try:
+    import orjson
+
+    def dumps(value):
+        return orjson.dumps(value)
+except ImportError:
+    def dumps(value):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+WELCOME_BODY = dumps({
+    "status": "success",
+    "details": " Welcome to my first HNG13 Task 0",
+})
+
+_ME_PREFIX = (
+    b'{"status":"success","user":'
+    + dumps({"email": EMAIL, "name": NAME, "stack": STACK})
+    + b',"timestamp":"'
+)
+_ME_FACT = b'","fact":'
+
+
+def me_body(timestamp, fact):
+    """Return the ``/me`` body with ``timestamp`` and ``fact`` spliced in.
+
+    ``timestamp`` must be the ISO 8601 string from ``utc_iso_now``, which never
+    needs JSON escaping.
+    """
+    return b"".join((_ME_PREFIX, timestamp.encode("ascii"), _ME_FACT, dumps(fact), b"}"))
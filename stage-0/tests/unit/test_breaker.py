@@ -0,0 +1,117 @@
+"""
+Unit tests for the upstream circuit breaker.
+"""
+
+import pytest
+
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("catfacts", failure_threshold=3, reset_timeout=30, half_open_max_calls=1, clock=clock)
+
+
+def _fail(breaker, times):
+    for _ in range(times):
+        assert breaker.allow()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(breaker):
+    """Test the breaker stays closed below the threshold and opens at it."""
+    _fail(breaker, 2)
+    assert breaker.state == CLOSED
+
+    _fail(breaker, 1)
+
+    assert breaker.state == OPEN
+    assert breaker.stats["opened"] == 1
+
+
+def test_success_resets_failure_count(breaker):
+    """Test only consecutive failures count towards opening."""
+    _fail(breaker, 2)
+    breaker.record_success()
+    _fail(breaker, 2)
+
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 2
+
+
+def test_open_rejects_until_reset_timeout(breaker, clock):
+    """Test calls fail fast while open and the retry time counts down."""
+    _fail(breaker, 3)
+    clock.now += 10
+
+    assert not breaker.allow()
+    assert breaker.stats["rejected"] == 1
+    assert breaker.snapshot()["retry_in_seconds"] == 20
+
+
+def test_half_open_success_closes(breaker, clock):
+    """Test closed -> open -> half-open -> closed."""
+    _fail(breaker, 3)
+    clock.now += 30
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only half_open_max_calls trial calls are let through.
+    assert not breaker.allow()
+
+    breaker.record_success()
+
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 0
+    assert breaker.allow()
+
+
+def test_half_open_failure_reopens(breaker, clock):
+    """Test a failed trial call opens the breaker again with a fresh timeout."""
+    _fail(breaker, 3)
+    clock.now += 30
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert breaker.stats["opened"] == 2
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+
+
+def test_half_open_allows_configured_trial_calls(clock):
+    """Test half_open_max_calls trial calls are allowed before rejecting."""
+    breaker = CircuitBreaker("catfacts", failure_threshold=1, reset_timeout=5, half_open_max_calls=2, clock=clock)
+    _fail(breaker, 1)
+    clock.now += 5
+
+    assert [breaker.allow() for _ in range(3)] == [True, True, False]
+
+
+def test_snapshot_reports_state(breaker):
+    """Test the status payload reflects the breaker state and counters."""
+    _fail(breaker, 3)
+
+    snapshot = breaker.snapshot()
+
+    assert snapshot["state"] == OPEN
+    assert snapshot["consecutive_failures"] == 3
+    assert snapshot["failures"] == 3
+    assert snapshot["retry_in_seconds"] == 30
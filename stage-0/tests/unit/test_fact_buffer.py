@@ -0,0 +1,93 @@
+"""
+Unit tests for the cat fact prefetch buffer.
+"""
+
+import asyncio
+import importlib
+import time
+
+import pytest
+
+import catfacts
+import config
+import fact_buffer
+
+UPSTREAM_SECONDS = 0.05
+
+
+class FakeUpstream:
+    """Serves numbered facts, one call at a time, like the FIFO limiter with
+    CATFACT_MAX_CONCURRENCY=1."""
+
+    def __init__(self):
+        self.calls = 0
+        self._limiter = None
+
+    async def fetch_fact(self):
+        if self._limiter is None:
+            self._limiter = asyncio.Semaphore(1)
+        async with self._limiter:
+            await asyncio.sleep(UPSTREAM_SECONDS)
+            self.calls += 1
+            return f"fact {self.calls}"
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    fake = FakeUpstream()
+    monkeypatch.setattr(catfacts, "fetch_fact", fake.fetch_fact)
+    return fake
+
+
+@pytest.fixture
+def buffer(monkeypatch, upstream):
+    """Fresh buffer refilling in batches of 10 from the fake upstream."""
+    monkeypatch.setattr(config, "FACT_REFILL_BATCH", 10)
+    yield importlib.reload(fact_buffer)
+    importlib.reload(fact_buffer)
+
+
+def test_refill_publishes_each_fact_as_it_arrives(buffer):
+    """Test facts reach the buffer one by one, before the batch finishes."""
+    async def run():
+        refill = asyncio.ensure_future(buffer.refill())
+        await asyncio.sleep(UPSTREAM_SECONDS * 2.5)
+        depth_mid_batch = len(buffer._buffer)
+        added = await refill
+        return depth_mid_batch, added
+
+    depth_mid_batch, added = asyncio.run(run())
+
+    assert depth_mid_batch == 2
+    assert added == 10
+    assert buffer.take() == "fact 1"
+
+
+def test_cold_take_joins_in_flight_refill(buffer, upstream):
+    """Test the first request waits for one refill fetch, not the whole batch."""
+    async def run():
+        refill = asyncio.ensure_future(buffer.refill())
+        await asyncio.sleep(0)
+        started = time.perf_counter()
+        fact = await buffer.take_or_fetch()
+        waited = time.perf_counter() - started
+        await refill
+        return fact, waited
+
+    fact, waited = asyncio.run(run())
+
+    assert fact == "fact 1"
+    assert waited < UPSTREAM_SECONDS * 3
+    # No extra upstream call was queued for the cold request.
+    assert upstream.calls == 10
+
+
+def test_cold_take_without_refill_fetches_directly(buffer, monkeypatch):
+    """Test a cold request with no refill in flight uses a shared fetch."""
+    async def fetch_shared():
+        return "shared fact"
+
+    monkeypatch.setattr(catfacts, "fetch_shared", fetch_shared)
+
+    assert asyncio.run(buffer.take_or_fetch()) == "shared fact"
+    assert buffer.take() == "shared fact"
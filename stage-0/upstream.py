@@ -0,0 +1,93 @@
+"""Shared, lifespan-managed HTTP client for upstream calls.
+
+A single ``httpx.AsyncClient`` is created on startup and reused by every
+request so connections to the upstream stay warm (keep-alive, and HTTP/2
+when the optional ``h2`` package is installed).
+"""
+import logging
+
+import httpx
+
+import config
+
+logger = logging.getLogger("stage0.upstream")
+
+try:
+    import h2  # noqa: F401  (optional, enables HTTP/2 in httpx)
+    _H2_AVAILABLE = True
+except ImportError:
+    _H2_AVAILABLE = False
+
+
+_client = None
+_stats = {
+    "requests": 0,
+    "in_flight": 0,
+    "peak_in_flight": 0,
+    "pool_timeouts": 0,
+    "errors": 0,
+}
+
+
+async def start():
+    """Create the shared client. Called once from the app lifespan."""
+    global _client
+    if _client is not None:
+        return
+    limits = httpx.Limits(
+        max_connections=config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(config.HTTP_TIMEOUT, pool=config.HTTP_POOL_TIMEOUT)
+    http2 = config.HTTP2_ENABLED and _H2_AVAILABLE
+    _client = httpx.AsyncClient(timeout=timeout, limits=limits, http2=http2)
+    logger.info(
+        "Upstream client started (max_connections=%s, keepalive=%s, http2=%s)",
+        config.HTTP_MAX_CONNECTIONS, config.HTTP_MAX_KEEPALIVE, http2,
+    )
+
+
+async def close():
+    """Close the shared client and release pooled connections."""
+    global _client
+    if _client is None:
+        return
+    await _client.aclose()
+    _client = None
+    logger.info("Upstream client closed")
+
+
+async def get(url, **kwargs):
+    """GET ``url`` through the shared pool, tracking pool usage."""
+    if _client is None:
+        raise RuntimeError("Upstream client is not started")
+    _stats["requests"] += 1
+    _stats["in_flight"] += 1
+    _stats["peak_in_flight"] = max(_stats["peak_in_flight"], _stats["in_flight"])
+    try:
+        return await _client.get(url, **kwargs)
+    except httpx.PoolTimeout:
+        _stats["pool_timeouts"] += 1
+        raise
+    except Exception:
+        _stats["errors"] += 1
+        raise
+    finally:
+        _stats["in_flight"] -= 1
+
+
+def pool_metrics():
+    """Return a snapshot of connection pool usage."""
+    max_conn = config.HTTP_MAX_CONNECTIONS
+    return {
+        "max_connections": max_conn,
+        "max_keepalive_connections": config.HTTP_MAX_KEEPALIVE,
+        "http2": bool(_client is not None and config.HTTP2_ENABLED and _H2_AVAILABLE),
+        "requests": _stats["requests"],
+        "in_flight": _stats["in_flight"],
+        "peak_in_flight": _stats["peak_in_flight"],
+        "saturation": round(_stats["in_flight"] / max_conn, 3) if max_conn else 0.0,
+        "pool_timeouts": _stats["pool_timeouts"],
+        "errors": _stats["errors"],
+    }
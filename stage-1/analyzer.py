@@ -0,0 +1,95 @@
+"""Fused string analysis.
+
+Computes length, unique character count, word count and the palindrome flag
+with as few passes over the value as possible, each pass running in C:
+
+- ASCII values are encoded to bytes once; the palindrome check then strips
+  non-alphanumerics with ``bytes.translate`` and lowercases with
+  ``bytes.lower`` instead of a per-character generator.
+- ASCII values of at least ``ANALYZE_NUMPY_MIN_LENGTH`` characters are
+  analyzed with NumPy when it is installed: one ``bincount`` gives the unique
+  count (and the frequency map), and lookup tables give the whitespace and
+  alphanumeric masks.
+- Anything else takes the generic path, which keeps the exact ``str``
+  semantics of the original implementation.
+
+All paths return identical results.
+"""
+from typing import Dict
+from collections import Counter
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_MIN_LENGTH = max(1, int(os.getenv("ANALYZE_NUMPY_MIN_LENGTH", "65536")))
+
+_ASCII_ALNUM = bytes(i for i in range(128) if chr(i).isalnum())
+_ASCII_NON_ALNUM = bytes(i for i in range(128) if not chr(i).isalnum())
+_ASCII_SPACE = bytes(i for i in range(128) if chr(i).isspace())
+
+if np is not None:
+    _IS_SPACE = np.zeros(128, dtype=bool)
+    _IS_SPACE[list(_ASCII_SPACE)] = True
+    _IS_ALNUM = np.zeros(128, dtype=bool)
+    _IS_ALNUM[list(_ASCII_ALNUM)] = True
+    _LOWER = np.frombuffer(bytes(range(128)).lower(), dtype=np.uint8)
+
+
+def _analyze_generic(value: str) -> Dict:
+    cleaned = "".join(map(str.lower, filter(str.isalnum, value)))
+    return {
+        "length": len(value),
+        "is_palindrome": bool(cleaned) and cleaned == cleaned[::-1],
+        "unique_characters": len(set(value)),
+        "word_count": len(value.split()),
+    }
+
+
+def _analyze_ascii(value: str, data: bytes) -> Dict:
+    cleaned = data.translate(None, _ASCII_NON_ALNUM).lower()
+    return {
+        "length": len(data),
+        "is_palindrome": bool(cleaned) and cleaned == cleaned[::-1],
+        "unique_characters": len(set(data)),
+        # str.split, not bytes.split: it also treats \x1c-\x1f as whitespace.
+        "word_count": len(value.split()),
+    }
+
+
+def _analyze_numpy(data: bytes) -> Dict:
+    codes = np.frombuffer(data, dtype=np.uint8)
+    space = _IS_SPACE[codes]
+    # A word starts at every non-space byte that follows a space (or the start).
+    word_count = int(np.count_nonzero(~space[1:] & space[:-1])) + (0 if space[0] else 1)
+    cleaned = _LOWER[codes[_IS_ALNUM[codes]]]
+    return {
+        "length": len(data),
+        "is_palindrome": bool(cleaned.size) and bool(np.array_equal(cleaned, cleaned[::-1])),
+        "unique_characters": int(np.count_nonzero(np.bincount(codes, minlength=128))),
+        "word_count": word_count,
+    }
+
+
+def analyze(value: str) -> Dict:
+    """Return length, is_palindrome, unique_characters and word_count."""
+    if not value.isascii():
+        return _analyze_generic(value)
+    data = value.encode("ascii")
+    if np is not None and len(data) >= NUMPY_MIN_LENGTH:
+        return _analyze_numpy(data)
+    return _analyze_ascii(value, data)
+
+
+def frequency_map(value: str) -> Dict[str, int]:
+    """Character counts of ``value`` in first-occurrence order."""
+    if np is not None and len(value) >= NUMPY_MIN_LENGTH and value.isascii():
+        data = value.encode("ascii")
+        counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=128)
+        # Keys must follow first occurrence, like Counter; only distinct bytes are ordered.
+        present = np.flatnonzero(counts)
+        first = [data.index(code) for code in present.tolist()]
+        return {chr(code): int(counts[code]) for _, code in sorted(zip(first, present.tolist()))}
+    return dict(Counter(value))
@@ -1,14 +1,37 @@
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, ConfigDict
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, FrozenSet, Tuple
+from models import StringRecord
 from datetime import datetime, timezone
+from contextlib import asynccontextmanager
+from fastapi.concurrency import run_in_threadpool
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import base64
+import json
+import os
 import db
+import entry_json
 import models
 import nlp_parser
+import workers
 
-app = FastAPI(title="String Analyzer Service - Stage 1", redirect_slashes=False)
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "10000"))
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", str(16 * 1024 * 1024)))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    db.open_storage()
+    try:
+        yield
+    finally:
+        workers.shutdown()
+        db.close_storage()
+
+
+app = FastAPI(title="String Analyzer Service - Stage 1", redirect_slashes=False, lifespan=lifespan)
 
 # Add CORS middleware to allow autograder access
 app.add_middleware(
@@ -29,54 +52,286 @@ class CreateRequest(BaseModel):
 def root():
     return {"ok": True}
 
+
+@app.get("/metrics")
+def metrics():
+    return {
+        "filter_cache": db.cache_metrics(),
+        "parse_cache": nlp_parser.parse_cache_metrics(),
+        "frequency_map_cache": models.frequency_cache_metrics(),
+        "entry_json_cache": entry_json.metrics(),
+    }
+
+def _digest_if_new(value: str) -> bytes:
+    digest = models.compute_digest(value)
+    if db.exists(value, digest):
+        raise HTTPException(status_code=409, detail="String already exists")
+    return digest
+
+
+def _json_response(body: bytes, status_code: int = 200) -> Response:
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+def _create_inline(value: str) -> Response:
+    digest = _digest_if_new(value)
+    props = models.analyze_string(value, digest)
+    entry = db.create_entry(value, props)
+    if entry is None:
+        # Created by a concurrent request since the existence check.
+        raise HTTPException(status_code=409, detail="String already exists")
+    return _json_response(entry_json.encode(entry), status_code=201)
+
+
+def _created_response(entry: StringRecord, frequency_map: Dict[str, int]) -> Response:
+    return _json_response(entry_json.encode_created(entry, frequency_map), status_code=201)
+
+
 @app.post("/strings", status_code=201)
-def create_string(req: CreateRequest):
+async def create_string(req: CreateRequest):
     if req.value is None:
         raise HTTPException(status_code=400, detail='Missing "value" field')
     if not isinstance(req.value, str):
         raise HTTPException(status_code=422, detail='"value" must be a string')
 
     value = req.value
-    if db.exists(value):
+    if len(value) > workers.MAX_VALUE_LENGTH:
+        raise HTTPException(status_code=413, detail=f'"value" exceeds {workers.MAX_VALUE_LENGTH} characters')
+    if not workers.should_offload(value):
+        return await run_in_threadpool(_create_inline, value)
+
+    # Large value: analyze it in a worker process so this one keeps serving.
+    digest = await run_in_threadpool(_digest_if_new, value)
+    try:
+        props, frequency_map = await workers.analyze_offloaded(value, digest)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="String analysis timed out")
+    except BrokenProcessPool:
+        raise HTTPException(status_code=503, detail="String analysis worker failed")
+    entry = await run_in_threadpool(db.create_entry, value, props)
+    if entry is None:
         raise HTTPException(status_code=409, detail="String already exists")
+    return await run_in_threadpool(_created_response, entry, frequency_map)
 
-    props = models.analyze_string(value)
-    entry = db.create_entry(value, props)
-    return JSONResponse(status_code=201, content=entry)
+
+def _too_many_items() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_ITEMS} items")
+
+
+async def _read_batch_body(request: Request) -> bytes:
+    """Read the request body, failing with 413 as soon as it exceeds BATCH_MAX_BYTES."""
+    too_large = HTTPException(status_code=413, detail=f"Batch body exceeds {BATCH_MAX_BYTES} bytes")
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > BATCH_MAX_BYTES:
+        raise too_large
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > BATCH_MAX_BYTES:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _parse_batch(body: bytes, ndjson: bool) -> List[Any]:
+    """Decode a batch body: a JSON array, or one JSON item per line for NDJSON.
+
+    Runs on the thread pool. NDJSON lines are counted before any is decoded.
+    """
+    try:
+        if ndjson:
+            lines = [line for line in body.splitlines() if line.strip()]
+            if len(lines) > BATCH_MAX_ITEMS:
+                raise _too_many_items()
+            return [json.loads(line) for line in lines]
+        items = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Batch body must be a JSON array")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise _too_many_items()
+    return items
+
+
+class InvalidItem(Exception):
+    """A rejected batch item; it gets its own status and the rest of the batch proceeds."""
+
+    def __init__(self, status: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def _batch_item_value(item: Any) -> str:
+    """Accept either a bare string or a ``{"value": ...}`` object, like POST /strings."""
+    if isinstance(item, dict):
+        if set(item) - {"value"}:
+            raise InvalidItem(422, "Unexpected fields")
+        item = item.get("value")
+        if item is None:
+            raise InvalidItem(400, 'Missing "value" field')
+    if not isinstance(item, str):
+        raise InvalidItem(422, '"value" must be a string')
+    if len(item) > workers.MAX_VALUE_LENGTH:
+        raise InvalidItem(413, f'"value" exceeds {workers.MAX_VALUE_LENGTH} characters')
+    return item
+
+
+def _check_new(values: List[str]) -> Tuple[List[bytes], List[bool]]:
+    digests = [models.compute_digest(value) for value in values]
+    seen = set()
+    is_new = []
+    for value, digest in zip(values, digests):
+        is_new.append(digest not in seen and not db.exists(value, digest))
+        seen.add(digest)
+    return digests, is_new
+
+
+@app.post("/strings/batch")
+async def create_strings_batch(request: Request):
+    """Create many strings at once from a JSON array or an NDJSON upload.
+
+    Each item gets its own status: 201 with the entry, 409 if the value
+    already exists (or appears earlier in the batch), 400/422 if invalid and
+    413 if longer than ``STRING_MAX_LENGTH``.
+    """
+    ndjson = request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE)
+    items = await run_in_threadpool(_parse_batch, await _read_batch_body(request), ndjson)
+
+    results: List[Optional[Dict]] = [None] * len(items)
+    positions, values = [], []
+    for i, item in enumerate(items):
+        try:
+            values.append(_batch_item_value(item))
+            positions.append(i)
+        except InvalidItem as e:
+            results[i] = {"status": e.status, "detail": e.detail}
+
+    digests, is_new = await run_in_threadpool(_check_new, values)
+    new = [i for i, flag in enumerate(is_new) if flag]
+    try:
+        properties = await workers.analyze_many([values[i] for i in new], [digests[i] for i in new])
+    except BrokenProcessPool:
+        raise HTTPException(status_code=503, detail="String analysis worker failed")
+    created = await run_in_threadpool(db.create_many, [(values[i], props) for i, props in zip(new, properties)])
+
+    conflict = {"status": 409, "detail": "String already exists"}
+    for i in range(len(values)):
+        results[positions[i]] = dict(conflict, value=values[i])
+    for i, entry in zip(new, created):
+        if entry is not None:
+            results[positions[i]] = {"status": 201, "data": entry}
+
+    counts = {"created": 0, "conflicts": 0, "invalid": 0}
+    for result in results:
+        status = result["status"]
+        counts["created" if status == 201 else "conflicts" if status == 409 else "invalid"] += 1
+    return _json_response(await run_in_threadpool(_encode_batch, results, counts))
+
+
+def _encode_batch(results: List[Dict], counts: Dict[str, int]) -> bytes:
+    """Encode the batch response; created entries are encoded (and kept) by ``entry_json``."""
+    parts = [
+        b'{"status":201,"data":' + entry_json.encode(result["data"]) + b"}" if result["status"] == 201 else entry_json.dumps(result)
+        for result in results
+    ]
+    return b'{"results":[' + b",".join(parts) + b"]," + entry_json.dumps(counts)[1:]
+
+
+def _encode_cursor(row: int) -> str:
+    return base64.urlsafe_b64encode(f"row:{row}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, row = raw.split(":", 1)
+        after = int(row)
+        if prefix != "row" or after < 0:
+            raise ValueError(cursor)
+        return after
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[FrozenSet[str]]:
+    try:
+        return models.parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _ndjson_response(entries: Iterable[StringRecord], headers: Optional[Dict[str, str]] = None, fields: Optional[FrozenSet[str]] = None) -> StreamingResponse:
+    lines = (entry_json.encode(entry, fields) + b"\n" for entry in entries)
+    return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE, headers=headers)
 
 
 @app.get("/strings")
 def list_strings(
+    request: Request,
     is_palindrome: Optional[bool] = Query(None),
     min_length: Optional[int] = Query(None, ge=0),
     max_length: Optional[int] = Query(None, ge=0),
     word_count: Optional[int] = Query(None, ge=0),
     contains_character: Optional[str] = Query(None, min_length=1, max_length=1),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    explain: bool = Query(False),
+    fields: Optional[str] = Query(None),
 ):
+    projection = _parse_fields(fields)
+    filters = {
+        "is_palindrome": is_palindrome,
+        "min_length": min_length,
+        "max_length": max_length,
+        "word_count": word_count,
+        "contains_character": contains_character,
+    }
+    after = _decode_cursor(cursor) if cursor is not None else None
+    if after is not None and limit is None:
+        raise HTTPException(status_code=400, detail='"cursor" requires "limit"')
     try:
-        results = db.filter_entries(
-            is_palindrome=is_palindrome,
-            min_length=min_length,
-            max_length=max_length,
-            word_count=word_count,
-            contains_character=contains_character,
-        )
+        if _wants_ndjson(request) and limit is None:
+            return _ndjson_response(db.iter_entries(**filters), fields=projection)
+        result = db.query(**filters, limit=limit, after=after, explain=explain)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    return {"data": results, "count": len(results), "filters_applied": {
-        k: v for k, v in {
-            "is_palindrome": is_palindrome,
-            "min_length": min_length,
-            "max_length": max_length,
-            "word_count": word_count,
-            "contains_character": contains_character,
-        }.items() if v is not None
+    if _wants_ndjson(request):
+        next_after = result["next_after"]
+        headers = {"X-Next-Cursor": _encode_cursor(next_after)} if next_after is not None else None
+        return _ndjson_response(result["data"], headers=headers, fields=projection)
+
+    response = {"count": result["count"], "filters_applied": {
+        k: v for k, v in filters.items() if v is not None
     }}
+    if limit is not None:
+        next_after = result["next_after"]
+        response["limit"] = limit
+        response["next_cursor"] = _encode_cursor(next_after) if next_after is not None else None
+    if explain:
+        response["plan"] = result["plan"]
+    return _json_response(entry_json.encode_list(result["data"], response, projection))
+
+
+@app.get("/stats/strings")
+def string_stats(top_characters: int = Query(10, ge=0, le=1000)):
+    """Totals, palindrome ratio, length and word count histograms and the
+    characters found in the most strings, from counters maintained on write."""
+    return db.stats(top_characters)
 
 
 @app.get("/strings/filter-by-natural-language")
-def filter_by_nl(query: str = Query(..., min_length=1)):
+def filter_by_nl(request: Request, query: str = Query(..., min_length=1), explain: bool = Query(False), fields: Optional[str] = Query(None)):
+    projection = _parse_fields(fields)
     parsed = nlp_parser.parse(query)
     if parsed is None:
         raise HTTPException(status_code=400, detail="Unable to parse natural language query")
@@ -84,16 +339,27 @@ def filter_by_nl(query: str = Query(..., min_length=1)):
     if parsed.get("min_length") and parsed.get("max_length") and parsed["min_length"] > parsed["max_length"]:
         raise HTTPException(status_code=422, detail="Parsed filters are conflicting")
 
-    results = db.filter_entries(**parsed)
-    return {"data": results, "count": len(results), "interpreted_query": {"original": query, "parsed_filters": parsed}}
+    if _wants_ndjson(request):
+        return _ndjson_response(db.iter_entries(**parsed), fields=projection)
+
+    plan = None
+    if explain:
+        results, plan = db.explain_filter(**parsed)
+    else:
+        results = db.filter_entries(**parsed)
+    response = {"count": len(results), "interpreted_query": {"original": query, "parsed_filters": parsed}}
+    if plan is not None:
+        response["plan"] = plan
+    return _json_response(entry_json.encode_list(results, response, projection))
 
 
 @app.get("/strings/{string_value}")
-def get_string(string_value: str):
+def get_string(string_value: str, fields: Optional[str] = Query(None)):
+    projection = _parse_fields(fields)
     entry = db.get_by_value(string_value)
     if not entry:
         raise HTTPException(status_code=404, detail="String not found")
-    return entry
+    return _json_response(entry_json.encode(entry, projection))
 
 
 @app.delete("/strings/{string_value}", status_code=204)
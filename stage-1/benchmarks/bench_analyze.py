@@ -0,0 +1,92 @@
+"""Micro-benchmark: cost of analyzing a value on ``POST /strings``.
+
+Compares the original ``analyze_string`` (hash in ``exists`` and again in the
+analysis, five passes plus an eager ``Counter``) with the fused analyzer and
+a single digest threaded through. Both sides build the frequency map,
+because the ``POST /strings`` response includes it. The NumPy row only appears when NumPy is
+installed.
+
+Run from the ``stage-1`` folder:
+
+    python benchmarks/bench_analyze.py [-n 2000]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import timeit
+from collections import Counter
+from hashlib import sha256
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analyzer  # noqa: E402
+import models  # noqa: E402
+
+
+def legacy_create(value):
+    """The original path: hash for ``exists``, then analyze and hash again."""
+    sha256(value.encode("utf-8")).hexdigest()
+    cleaned = ''.join(c.lower() for c in value if c.isalnum())
+    is_palindrome = cleaned == cleaned[::-1] if cleaned else False
+    unique_characters = len(set(value))
+    word_count = 0
+    if value.strip():
+        word_count = len(value.split())
+    return {
+        "length": len(value),
+        "is_palindrome": is_palindrome,
+        "unique_characters": unique_characters,
+        "word_count": word_count,
+        "sha256_hash": sha256(value.encode("utf-8")).hexdigest(),
+        "character_frequency_map": dict(Counter(value)),
+    }
+
+
+def fused_create(value):
+    """The current path: one digest, the fused analyzer, and the frequency map for the response.
+
+    ``analyzer.frequency_map`` is called directly to bypass the memoized
+    ``models.frequency_map``, which would turn repeat calls into cache hits.
+    """
+    properties = models.analyze_string(value, models.compute_digest(value))
+    properties["character_frequency_map"] = analyzer.frequency_map(value)
+    return properties
+
+
+def sample(rng, length, alphabet):
+    return "".join(rng.choices(alphabet, k=length))
+
+
+def bench(fn, value, number):
+    best = min(timeit.repeat(lambda: fn(value), number=number, repeat=5))
+    return best / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=2000, help="calls per timing run (scaled down for long values)")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    ascii_words = string.ascii_letters + string.digits + "    ,."
+    cases = [
+        ("ascii 32", sample(rng, 32, ascii_words)),
+        ("ascii 1k", sample(rng, 1_000, ascii_words)),
+        ("ascii 100k", sample(rng, 100_000, ascii_words)),
+        ("ascii 1M", sample(rng, 1_000_000, ascii_words)),
+        ("unicode 1k", sample(rng, 1_000, ascii_words + "éßΣ日本語")),
+    ]
+    numpy_state = f"on for >= {analyzer.NUMPY_MIN_LENGTH} chars" if analyzer.np is not None else "not installed"
+    print(f"numpy: {numpy_state}, best of 5\n")
+    print(f"{'value':<12}{'original':>14}{'fused':>14}{'speedup':>10}")
+    for name, value in cases:
+        number = max(1, args.number * 32 // max(32, len(value) // 32))
+        old_us = bench(legacy_create, value, number)
+        new_us = bench(fused_create, value, number)
+        print(f"{name:<12}{old_us:>11.1f} us{new_us:>11.1f} us{old_us / new_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
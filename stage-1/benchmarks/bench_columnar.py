@@ -0,0 +1,81 @@
+"""Filter benchmark: dict-walking scan vs index planner vs NumPy columns.
+
+Loads ``-n`` entries into the memory store with ``STORE_ENGINE=columnar``
+and times each numeric filter three ways: ``_entry_matches`` over every
+record, the bitmap/bisect planner (columns switched off), and the
+vectorized column mask.
+
+Run from the ``stage-1`` folder (requires NumPy):
+
+    python benchmarks/bench_columnar.py [-n 1000000]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+os.environ["STORE_ENGINE"] = "columnar"
+os.environ["STORE_DATA_DIR"] = ""
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import memory_store as store  # noqa: E402
+import models  # noqa: E402
+
+QUERIES = [
+    {"min_length": 10, "max_length": 20},
+    {"is_palindrome": False, "word_count": 3},
+    {"is_palindrome": False, "min_length": 5, "word_count": 2},
+    {"min_length": 1},
+]
+FILTERS = ("is_palindrome", "min_length", "max_length", "word_count", "contains_character")
+
+
+def scan(filters):
+    args = [filters.get(name) for name in FILTERS]
+    return [e.digest for e in store._iter_rows(None) if store._entry_matches(e, *args)]
+
+
+def planned(filters):
+    return store._execute(store._plan(*(filters.get(name) for name in FILTERS)))
+
+
+def best_ms(fn, filters, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(filters)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=1_000_000, help="entries to load")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    alphabet = string.ascii_lowercase + "   "
+    values = {"".join(rng.choices(alphabet, k=rng.randint(1, 30))) + str(i) for i in range(args.number)}
+    started = time.perf_counter()
+    store.create_many((value, models.analyze_string(value)) for value in values)
+    print(f"loaded {store._count()} entries in {time.perf_counter() - started:.1f}s; "
+          f"columns use {store._COLUMNS.memory_bytes() / 2**20:.1f} MiB\n")
+
+    columns = store._COLUMNS
+    print(f"{'filter':<55}{'rows':>9}{'scan':>11}{'index':>11}{'columnar':>11}")
+    for filters in QUERIES:
+        scan_ms, rows = best_ms(scan, filters, args.repeat)
+        store._COLUMNS = None
+        index_ms, index_rows = best_ms(planned, filters, args.repeat)
+        store._COLUMNS = columns
+        columnar_ms, columnar_rows = best_ms(planned, filters, args.repeat)
+        assert rows == index_rows == columnar_rows, filters
+        label = ", ".join(f"{k}={v}" for k, v in filters.items())
+        print(f"{label:<55}{rows:>9}{scan_ms:>8.1f} ms{index_ms:>8.1f} ms{columnar_ms:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Contention benchmark: the memory store under many concurrent threads.
+
+Every thread runs the ``POST /strings`` sequence (exists, analyze, create)
+plus lookups, exists checks and deletes against a shared key space, so many
+threads race to create the same values. Each thread count runs in a fresh
+process.
+
+Besides throughput it checks that insert-if-absent holds: the number of
+successful creates minus successful deletes must equal the final store size.
+
+Run from the ``stage-1`` folder:
+
+    python benchmarks/bench_contention.py [--ops 20000] [--threads 1 32 64]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def worker(store, models, keys, ops, seed, counts, barrier):
+    rng = random.Random(seed)
+    created = deleted = 0
+    barrier.wait()
+    for _ in range(ops):
+        value = rng.choice(keys)
+        op = rng.random()
+        if op < 0.5:
+            digest = models.compute_digest(value)
+            if not store.exists(value, digest):
+                if store.create_entry(value, models.analyze_string(value, digest)) is not None:
+                    created += 1
+        elif op < 0.9:
+            store.get_by_value(value)
+        else:
+            deleted += store.delete_by_value(value)
+    counts.append((created, deleted))
+
+
+def run_one(threads, ops):
+    sys.path.insert(0, ROOT)
+    import memory_store as store
+    import models
+
+    keys = [f"value {i} {'x' * (i % 40)}" for i in range(max(1000, ops // 10))]
+    counts = []
+    barrier = threading.Barrier(threads + 1)
+    pool = [
+        threading.Thread(target=worker, args=(store, models, keys, ops // threads, i, counts, barrier))
+        for i in range(threads)
+    ]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    created = sum(c for c, _ in counts)
+    deleted = sum(d for _, d in counts)
+    print(json.dumps({
+        "ops_per_s": (ops // threads) * threads / elapsed,
+        "consistent": created - deleted == store._count(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=20000, help="total operations per run")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 32, 64])
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_one(args.child, args.ops)
+        return
+
+    print(f"{args.ops} ops per run, 50% create / 40% get / 10% delete\n")
+    print(f"{'threads':>8}{'ops/s':>12}{'consistent':>12}")
+    for threads in args.threads:
+        env = dict(os.environ, STORE_DATA_DIR="")
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", str(threads), "--ops", str(args.ops)],
+            env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(out)
+        print(f"{threads:>8}{result['ops_per_s']:>12.0f}{str(result['consistent']):>12}")
+
+
+if __name__ == "__main__":
+    main()
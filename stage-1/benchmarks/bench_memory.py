@@ -0,0 +1,72 @@
+"""Memory benchmark: bytes per stored entry, dict-of-dicts vs ``StringRecord``.
+
+Analyzes and stores ``-n`` values both ways and measures what stays alive
+with ``tracemalloc``. The value strings are created before measuring, so
+only the per-entry overhead is counted.
+
+Run from the ``stage-1`` folder:
+
+    python benchmarks/bench_memory.py [-n 1000000]
+"""
+import argparse
+import gc
+import os
+import random
+import string
+import sys
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+
+ALPHABET = string.ascii_lowercase + "     "
+
+
+def dict_entry(value, properties):
+    """The original ``models.make_entry``: a nested dict with hex ids and an eager frequency map."""
+    return {
+        "id": properties["sha256_hash"],
+        "value": value,
+        "properties": {**properties, "character_frequency_map": dict(Counter(value))},
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def measure(build, values):
+    gc.collect()
+    tracemalloc.start()
+    store = {}
+    for value in values:
+        store[value] = build(value, models.analyze_string(value))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=1_000_000, help="entries to store")
+    parser.add_argument("--length", type=int, default=24, help="average value length")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    values = list({
+        "".join(rng.choices(ALPHABET, k=rng.randint(1, 2 * args.length))) + str(i)
+        for i in range(args.number)
+    })
+    print(f"{len(values)} entries, average value length {sum(map(len, values)) / len(values):.1f}\n")
+    print(f"{'representation':<18}{'total':>12}{'per entry':>14}")
+    results = []
+    for name, build in (("dict of dicts", dict_entry), ("StringRecord", models.make_entry)):
+        store, used = measure(build, values)
+        results.append(used)
+        print(f"{name:<18}{used / 2**20:>9.1f} MiB{used / len(values):>11.0f} B")
+        del store
+    print(f"\nsaved {(1 - results[1] / results[0]) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
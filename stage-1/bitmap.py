@@ -0,0 +1,55 @@
+from typing import Iterator
+
+
+# Set-bit positions for every byte value, used to decode bitmaps quickly.
+_BIT_POSITIONS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+class Bitmap:
+    """Bitmap over dense integer row ids.
+
+    Bits live in a mutable bytearray so add/discard/contains are O(1). For
+    bulk AND/OR a bitmap is converted to a Python int (one C-level copy) and
+    combined with the native ``&``/``|`` operators; ``iter_rows`` decodes the
+    result back to row ids.
+    """
+
+    __slots__ = ("_bits", "_count")
+
+    def __init__(self) -> None:
+        self._bits = bytearray()
+        self._count = 0
+
+    def add(self, row: int) -> None:
+        byte, mask = row >> 3, 1 << (row & 7)
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(byte + 1 - len(self._bits)))
+        if not self._bits[byte] & mask:
+            self._bits[byte] |= mask
+            self._count += 1
+
+    def discard(self, row: int) -> None:
+        byte, mask = row >> 3, 1 << (row & 7)
+        if byte < len(self._bits) and self._bits[byte] & mask:
+            self._bits[byte] &= ~mask
+            self._count -= 1
+
+    def __contains__(self, row: int) -> bool:
+        byte = row >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] >> (row & 7) & 1)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def to_int(self) -> int:
+        return int.from_bytes(self._bits, "little")
+
+
+def iter_rows(bits: int) -> Iterator[int]:
+    """Yield the row ids set in an int bitmap, in ascending order."""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for i, byte in enumerate(data):
+        if byte:
+            base = i << 3
+            for bit in _BIT_POSITIONS[byte]:
+                yield base + bit
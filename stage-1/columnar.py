@@ -0,0 +1,77 @@
+"""Columnar property store for vectorized filtering (requires NumPy).
+
+``length``, ``word_count``, ``unique_characters`` and ``is_palindrome`` are
+kept in contiguous NumPy arrays indexed by the store's row id, next to an
+``alive`` mask. Deleting a row clears its bit in the mask (a tombstone); the
+slot is never reused, because row ids double as pagination cursors. Arrays
+grow by doubling. ``mask`` evaluates every numeric predicate as one
+boolean mask; ``select`` returns the matching rows in ascending
+(insertion) order.
+
+Mutations must be serialized by the caller. Readers may run concurrently:
+they work on the first ``size`` rows of the arrays they read, and a resize
+swaps in new arrays without touching the old ones.
+"""
+from typing import Optional
+
+import numpy as np
+
+_INITIAL_CAPACITY = 1024
+
+
+class ColumnStore:
+    __slots__ = ("size", "_length", "_word_count", "_unique", "_palindrome", "_alive")
+
+    def __init__(self) -> None:
+        self.size = 0
+        self._length = np.zeros(_INITIAL_CAPACITY, dtype=np.int64)
+        self._word_count = np.zeros(_INITIAL_CAPACITY, dtype=np.int32)
+        self._unique = np.zeros(_INITIAL_CAPACITY, dtype=np.int32)
+        self._palindrome = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+        self._alive = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+
+    def _grow(self, capacity: int) -> None:
+        for name in ("_length", "_word_count", "_unique", "_palindrome", "_alive"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def append(self, row: int, length: int, word_count: int, unique_characters: int, is_palindrome: bool) -> None:
+        """Store the properties of ``row``, which must be the next row id."""
+        if row >= len(self._alive):
+            self._grow(max(row + 1, 2 * len(self._alive)))
+        self._length[row] = length
+        self._word_count[row] = word_count
+        self._unique[row] = unique_characters
+        self._palindrome[row] = is_palindrome
+        self._alive[row] = True
+        self.size = row + 1
+
+    def remove(self, row: int) -> None:
+        self._alive[row] = False
+
+    def mask(self, is_palindrome: Optional[bool] = None, min_length: Optional[int] = None, max_length: Optional[int] = None, word_count: Optional[int] = None, min_unique: Optional[int] = None, max_unique: Optional[int] = None) -> np.ndarray:
+        """Return a boolean mask over rows: live and matching every given predicate."""
+        n = self.size
+        mask = self._alive[:n].copy()
+        if is_palindrome is not None:
+            mask &= self._palindrome[:n] == is_palindrome
+        if min_length is not None:
+            mask &= self._length[:n] >= min_length
+        if max_length is not None:
+            mask &= self._length[:n] <= max_length
+        if word_count is not None:
+            mask &= self._word_count[:n] == word_count
+        if min_unique is not None:
+            mask &= self._unique[:n] >= min_unique
+        if max_unique is not None:
+            mask &= self._unique[:n] <= max_unique
+        return mask
+
+    def select(self, **predicates: Optional[int]) -> np.ndarray:
+        """Return the live rows matching ``predicates`` (see ``mask``), ascending."""
+        return np.flatnonzero(self.mask(**predicates))
+
+    def memory_bytes(self) -> int:
+        return sum(a.nbytes for a in (self._length, self._word_count, self._unique, self._palindrome, self._alive))
@@ -0,0 +1,96 @@
+"""JSON encodings of entries, kept on the records themselves.
+
+The full JSON form of an entry (the default response shape, frequency map
+included) is encoded once and stored in the record's ``encoded`` slot.
+Creates fill it when they encode their response (``POST /strings``, batch
+items and offloaded creates, which reuse the frequency map computed by the
+worker); a record loaded from disk is encoded on its first read. List
+responses are then assembled by joining the stored bytes, however large
+the listing. The bytes live and die with the record, so a value deleted and
+created again is a new record and never served stale.
+
+With the SQLite backend every read builds fresh records, so entries are
+encoded per response there. ``ENTRY_JSON_CACHE=false`` stops keeping the
+bytes, trading encoding time for memory.
+
+``orjson`` is used when installed, otherwise the stdlib encoder with the same
+compact settings as ``JSONResponse``.
+"""
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+import json
+import os
+import threading
+
+import models
+from models import StringRecord
+
+try:
+    import orjson
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value)
+except ImportError:
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+KEEP_ENCODED = os.getenv("ENTRY_JSON_CACHE", "true").lower() in ("1", "true", "yes")
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _count(hits: int, misses: int) -> None:
+    with _lock:
+        _stats["hits"] += hits
+        _stats["misses"] += misses
+
+
+def _encode_full(entry: StringRecord) -> bytes:
+    body = entry.encoded
+    if body is None:
+        body = dumps(entry.to_dict())
+        if KEEP_ENCODED:
+            entry.encoded = body
+    return body
+
+
+def encode(entry: StringRecord, fields: Optional[FrozenSet[str]] = None) -> bytes:
+    """Return ``entry.to_dict(fields)`` as JSON bytes, stored on the record for the full form."""
+    if fields is not None:
+        return dumps(entry.to_dict(fields))
+    hit = entry.encoded is not None
+    body = _encode_full(entry)
+    _count(hit, not hit)
+    return body
+
+
+def encode_created(entry: StringRecord, frequency_map: Dict[str, int]) -> bytes:
+    """Encode a new entry whose frequency map is already known (an offloaded create)."""
+    content = entry.to_dict(models.STORED_FIELDS)
+    content["properties"]["character_frequency_map"] = frequency_map
+    body = dumps(content)
+    if KEEP_ENCODED:
+        entry.encoded = body
+    _count(0, 1)
+    return body
+
+
+def encode_list(entries: Iterable[StringRecord], rest: Dict, fields: Optional[FrozenSet[str]] = None) -> bytes:
+    """Encode ``{"data": [entries...], **rest}`` by joining per-entry encodings."""
+    if fields is not None:
+        parts = [dumps(entry.to_dict(fields)) for entry in entries]
+    else:
+        parts = []
+        hits = 0
+        for entry in entries:
+            hits += entry.encoded is not None
+            parts.append(_encode_full(entry))
+        _count(hits, len(parts) - hits)
+    data = b'{"data":[' + b",".join(parts) + b"]"
+    return data + (b"," + dumps(rest)[1:] if rest else b"}")
+
+
+def metrics() -> Dict:
+    with _lock:
+        return {**_stats, "enabled": KEEP_ENCODED}
@@ -0,0 +1,550 @@
+"""Indexed in-memory store (the default backend).
+
+Concurrency: every mutation runs under ``_WRITE_LOCK``. A create holds it
+across the existence check and the insert, so two requests for the same
+value cannot both succeed, and the write-ahead log order matches the
+in-memory order.
+
+Readers take no locks. Lookups are single dict operations, index reads copy
+what they iterate with one C-level call, and scans skip entries that are
+deleted while they run.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Sequence, Set, Tuple
+from bisect import bisect_left, bisect_right, insort
+from heapq import nlargest
+from operator import itemgetter
+import os
+import threading
+import time
+import models
+import storage
+from bitmap import Bitmap, iter_rows
+from models import StringRecord
+from result_cache import ResultCache
+
+
+# Records keyed by their binary SHA-256 digest.
+_STORE: Dict[bytes, StringRecord] = {}
+# Dense integer row ids, assigned in insertion order and never reused.
+_ROW_OF: Dict[bytes, int] = {}
+_ROWS: List[Optional[bytes]] = []
+# Secondary index: (length, digest) pairs kept sorted so length ranges resolve by bisect.
+_LENGTH_INDEX: List[Tuple[int, bytes]] = []
+_length_key = itemgetter(0)
+# Inverted index: character -> digests of entries whose value contains it.
+_CHAR_INDEX: Dict[str, Set[bytes]] = {}
+# Low-cardinality property indexes: property value -> bitmap of row ids.
+_PALINDROME_INDEX: Dict[bool, Bitmap] = {True: Bitmap(), False: Bitmap()}
+_WORD_COUNT_INDEX: Dict[int, Bitmap] = {}
+# Planner statistics: number of entries per length.
+_LENGTH_HISTOGRAM: Dict[int, int] = {}
+# Sum of all value lengths, for the average in stats().
+_TOTAL_LENGTH = 0
+# Serializes mutations so the write-ahead log order matches the in-memory order.
+_WRITE_LOCK = threading.Lock()
+# Bumped on every insert and remove; cached filter results from older versions are stale.
+_VERSION = 0
+# Filter tuple -> matching ids, for repeated filtered listings.
+_RESULT_CACHE = ResultCache(int(os.getenv("FILTER_CACHE_SIZE", "256")))
+
+# STORE_ENGINE=columnar also keeps the numeric properties in NumPy columns
+# (columnar.py) and evaluates all numeric filters as one vectorized mask.
+ENGINE = os.getenv("STORE_ENGINE", "index").lower()
+if ENGINE == "columnar":
+    try:
+        from columnar import ColumnStore
+    except ImportError:
+        raise RuntimeError("STORE_ENGINE=columnar requires numpy")
+    _COLUMNS: Optional["ColumnStore"] = ColumnStore()
+elif ENGINE == "index":
+    _COLUMNS = None
+else:
+    raise RuntimeError(f"Unknown STORE_ENGINE {ENGINE!r}; expected 'index' or 'columnar'")
+
+
+def _lookup(digest: bytes) -> Optional[StringRecord]:
+    return _STORE.get(digest)
+
+
+def _count() -> int:
+    return len(_ROW_OF)
+
+
+def exists(value: str, digest: Optional[bytes] = None) -> bool:
+    if digest is None:
+        digest = models.compute_digest(value)
+    return digest in _STORE
+
+
+def _index_add(entry: StringRecord, sort_length: bool = True) -> None:
+    global _VERSION, _TOTAL_LENGTH
+    entry_id = entry.digest
+    length = entry.length
+    _TOTAL_LENGTH += length
+    row = len(_ROWS)
+    _ROWS.append(entry_id)
+    _ROW_OF[entry_id] = row
+    if sort_length:
+        insort(_LENGTH_INDEX, (length, entry_id))
+    else:
+        # Bulk load: the caller sorts _LENGTH_INDEX once at the end.
+        _LENGTH_INDEX.append((length, entry_id))
+    _LENGTH_HISTOGRAM[length] = _LENGTH_HISTOGRAM.get(length, 0) + 1
+    for ch in set(entry.value):
+        _CHAR_INDEX.setdefault(ch, set()).add(entry_id)
+    _PALINDROME_INDEX[entry.is_palindrome].add(row)
+    _WORD_COUNT_INDEX.setdefault(entry.word_count, Bitmap()).add(row)
+    if _COLUMNS is not None:
+        _COLUMNS.append(row, length, entry.word_count, entry.unique_characters, entry.is_palindrome)
+    # Bump last: a query that read the old version while the indexes were
+    # changing must see its cached result as stale (see ResultCache).
+    _VERSION += 1
+
+
+def _discard(index: Dict[Any, Any], key: Any, member: Any) -> None:
+    members = index.get(key)
+    if members is not None:
+        members.discard(member)
+        if not members:
+            del index[key]
+
+
+def _index_remove(entry: StringRecord) -> None:
+    global _VERSION, _TOTAL_LENGTH
+    entry_id = entry.digest
+    length = entry.length
+    _TOTAL_LENGTH -= length
+    row = _ROW_OF.pop(entry_id)
+    _ROWS[row] = None
+    key = (length, entry_id)
+    i = bisect_left(_LENGTH_INDEX, key)
+    if i < len(_LENGTH_INDEX) and _LENGTH_INDEX[i] == key:
+        del _LENGTH_INDEX[i]
+    if _LENGTH_HISTOGRAM.get(length, 0) <= 1:
+        _LENGTH_HISTOGRAM.pop(length, None)
+    else:
+        _LENGTH_HISTOGRAM[length] -= 1
+    for ch in set(entry.value):
+        _discard(_CHAR_INDEX, ch, entry_id)
+    _PALINDROME_INDEX[entry.is_palindrome].discard(row)
+    _discard(_WORD_COUNT_INDEX, entry.word_count, row)
+    if _COLUMNS is not None:
+        _COLUMNS.remove(row)
+    _VERSION += 1
+
+
+def _insert(entry: StringRecord) -> None:
+    """Insert or replace ``entry`` during recovery; the caller holds _WRITE_LOCK.
+
+    The length index is left unsorted (and may keep removed pairs);
+    open_storage rebuilds it once at the end.
+    """
+    previous = _STORE.get(entry.digest)
+    if previous is not None:
+        _index_remove(previous)
+    _STORE[entry.digest] = entry
+    _index_add(entry, sort_length=False)
+
+
+def _remove(entry_id: bytes) -> Optional[StringRecord]:
+    entry = _STORE.pop(entry_id, None)
+    if entry is not None:
+        _index_remove(entry)
+    return entry
+
+
+def _snapshot_entries() -> Iterator[Dict]:
+    return (entry.to_dict(models.STORED_FIELDS) for entry in _iter_rows(None))
+
+
+def _maybe_snapshot() -> None:
+    """Start a background snapshot when one is due; the caller holds _WRITE_LOCK.
+
+    Only the record list is copied here, with C-level calls. Records are
+    immutable, so the background thread can serialize them after the lock
+    is released and still see the store exactly as of the rotated log.
+    """
+    if storage.snapshot_due():
+        records = list(map(_STORE.__getitem__, filter(None, _ROWS)))
+        storage.start_snapshot(entry.to_dict(models.STORED_FIELDS) for entry in records)
+
+
+def create_entry(value: str, properties: Dict) -> Optional[StringRecord]:
+    """Insert ``value`` unless it already exists; return None if it does."""
+    entry = models.make_entry(value, properties)
+    with _WRITE_LOCK:
+        if entry.digest in _STORE:
+            return None
+        if storage.enabled():
+            storage.log_create(entry.to_dict(models.STORED_FIELDS))
+        _STORE[entry.digest] = entry
+        _index_add(entry)
+        _maybe_snapshot()
+    return entry
+
+
+def create_many(items: Iterable[Tuple[str, Dict]]) -> List[Optional[StringRecord]]:
+    """Insert analyzed ``(value, properties)`` pairs under one write lock.
+
+    The log is written with a single flush and the length index is sorted
+    once rather than per entry. Return the new record for each item, or None
+    where the value already exists (including earlier in the same batch).
+    """
+    entries = [models.make_entry(value, properties) for value, properties in items]
+    results: List[Optional[StringRecord]] = []
+    with _WRITE_LOCK:
+        fresh: Dict[bytes, StringRecord] = {}
+        for entry in entries:
+            if entry.digest in _STORE or entry.digest in fresh:
+                results.append(None)
+            else:
+                fresh[entry.digest] = entry
+                results.append(entry)
+        if storage.enabled():
+            storage.log_creates(entry.to_dict(models.STORED_FIELDS) for entry in fresh.values())
+        for entry in fresh.values():
+            _STORE[entry.digest] = entry
+            _index_add(entry, sort_length=False)
+        if fresh:
+            _LENGTH_INDEX.sort()
+        _maybe_snapshot()
+    return results
+
+
+def get_by_value(value: str) -> Optional[StringRecord]:
+    return _lookup(models.compute_digest(value))
+
+
+def delete_by_value(value: str) -> bool:
+    digest = models.compute_digest(value)
+    with _WRITE_LOCK:
+        if digest not in _STORE:
+            return False
+        storage.log_delete(digest.hex())
+        _remove(digest)
+        _maybe_snapshot()
+    return True
+
+
+def open_storage() -> Dict:
+    """Recover the store from disk (if persistence is enabled) and start logging."""
+    with _WRITE_LOCK:
+        status = storage.recover(
+            lambda entry: _insert(StringRecord.from_dict(entry)),
+            lambda entry_id: _remove(bytes.fromhex(entry_id)),
+        )
+        # One O(N log N) sort instead of an insort per recovered record.
+        _LENGTH_INDEX[:] = sorted((entry.length, entry.digest) for entry in _STORE.values())
+        return status
+
+
+def close_storage() -> None:
+    """Write a final snapshot and close the log."""
+    with _WRITE_LOCK:
+        storage.write_snapshot(_snapshot_entries())
+        storage.close()
+
+
+def _entry_matches(entry: StringRecord, is_palindrome: Optional[bool], min_length: Optional[int], max_length: Optional[int], word_count: Optional[int], contains_character: Optional[str]) -> bool:
+    if is_palindrome is not None and entry.is_palindrome != is_palindrome:
+        return False
+    if min_length is not None and entry.length < min_length:
+        return False
+    if max_length is not None and entry.length > max_length:
+        return False
+    if word_count is not None and entry.word_count != word_count:
+        return False
+    if contains_character is not None:
+        if len(contains_character) != 1:
+            raise ValueError("contains_character must be a single character")
+        if contains_character not in entry.value:
+            return False
+    return True
+
+
+def _length_bounds(min_length: Optional[int], max_length: Optional[int]) -> Tuple[int, int]:
+    """Return the slice of _LENGTH_INDEX with min_length <= length <= max_length."""
+    lo = 0 if min_length is None else bisect_left(_LENGTH_INDEX, min_length, key=_length_key)
+    hi = len(_LENGTH_INDEX) if max_length is None else bisect_right(_LENGTH_INDEX, max_length, key=_length_key)
+    return lo, hi
+
+
+def statistics() -> Dict:
+    """Per-property statistics the planner uses to estimate selectivity."""
+    return {
+        "total": _count(),
+        "length_histogram": dict(sorted(_LENGTH_HISTOGRAM.items())),
+        "palindrome": {str(k).lower(): len(v) for k, v in _PALINDROME_INDEX.items()},
+        "word_count": {wc: len(ids) for wc, ids in sorted(_WORD_COUNT_INDEX.items())},
+        "characters": {ch: len(ids) for ch, ids in sorted(_CHAR_INDEX.items())},
+    }
+
+
+def stats(top_characters: int = 10) -> Dict:
+    """Aggregates for /stats/strings, read from the counters and indexes kept
+    up to date on every insert and delete. Cost depends on the number of
+    distinct lengths, word counts and characters, not on the number of entries.
+    """
+    # Copy each structure with one C-level call; a writer may be mutating it.
+    total = _count()
+    palindromes = len(_PALINDROME_INDEX[True])
+    word_counts = list(_WORD_COUNT_INDEX.items())
+    characters = list(_CHAR_INDEX.items())
+    return {
+        "total": total,
+        "palindromes": palindromes,
+        "palindrome_ratio": palindromes / total if total else 0.0,
+        "average_length": _TOTAL_LENGTH / total if total else 0.0,
+        "length_histogram": dict(sorted(_LENGTH_HISTOGRAM.copy().items())),
+        "word_count_histogram": {wc: len(bm) for wc, bm in sorted(word_counts)},
+        "top_characters": [
+            {"character": ch, "strings": n}
+            for ch, n in nlargest(top_characters, ((ch, len(ids)) for ch, ids in characters), key=itemgetter(1))
+        ],
+    }
+
+
+def _plan(is_palindrome: Optional[bool], min_length: Optional[int], max_length: Optional[int], word_count: Optional[int], contains_character: Optional[str]) -> List[Dict]:
+    """Return one step per filter, most selective first.
+
+    Each step carries its estimated row count from index cardinalities and
+    the index it reads: an id set, a row bitmap, or (for the length range)
+    bisect bounds that are only materialized when the range drives the query.
+    """
+    steps = []
+    if is_palindrome is not None:
+        bm = _PALINDROME_INDEX[is_palindrome]
+        steps.append({"index": "is_palindrome", "value": is_palindrome, "estimated_rows": len(bm), "bitmap": bm})
+    if word_count is not None:
+        bm = _WORD_COUNT_INDEX.get(word_count, Bitmap())
+        steps.append({"index": "word_count", "value": word_count, "estimated_rows": len(bm), "bitmap": bm})
+    if contains_character is not None:
+        ids = _CHAR_INDEX.get(contains_character, set())
+        steps.append({"index": "contains_character", "value": contains_character, "estimated_rows": len(ids), "ids": ids})
+    if min_length is not None or max_length is not None:
+        lo, hi = _length_bounds(min_length, max_length)
+        steps.append({"index": "length", "value": [min_length, max_length], "estimated_rows": max(0, hi - lo), "bounds": (lo, hi)})
+    if _COLUMNS is not None:
+        # Fold every numeric filter into one vectorized step.
+        numeric = [s for s in steps if "ids" not in s]
+        if numeric:
+            steps = [s for s in steps if "ids" in s]
+            steps.append({
+                "index": "columnar",
+                "value": [s["index"] for s in numeric],
+                "estimated_rows": min(s["estimated_rows"] for s in numeric),
+                "columns": {"is_palindrome": is_palindrome, "min_length": min_length, "max_length": max_length, "word_count": word_count},
+            })
+    steps.sort(key=itemgetter("estimated_rows"))
+    return steps
+
+
+def _execute(steps: List[Dict]) -> List[int]:
+    """Run a plan from _plan and return the matching rows in ascending
+    (insertion) order.
+
+    The first step drives. If it is a bitmap, every bitmap step is ANDed
+    into it before decoding rows; otherwise bitmaps are probed per candidate
+    in O(1). Id sets are intersected smallest-first and a non-driving length
+    range is checked per remaining candidate as a residual predicate.
+    """
+    if not steps:
+        return [row for row, entry_id in enumerate(_ROWS[:]) if entry_id is not None]
+
+    driver = steps[0]
+    driver["access"] = "drive"
+    rest = steps[1:]
+    probes = []
+    if "bitmap" in driver:
+        bits = driver["bitmap"].to_int()
+        for step in rest:
+            if "bitmap" in step:
+                step["access"] = "intersect"
+                bits &= step["bitmap"].to_int()
+        # A row deleted after to_int() copied the bitmap reads back as None.
+        ids = {entry_id for entry_id in map(_ROWS.__getitem__, iter_rows(bits)) if entry_id is not None}
+    elif "ids" in driver:
+        # Copy: the live set may change while this query iterates it.
+        ids = set(driver["ids"])
+    elif "columns" in driver:
+        # Rows come back ascending, so the ids stay in insertion order.
+        rows = _COLUMNS.select(**driver["columns"]).tolist()
+        ids = [entry_id for entry_id in map(_ROWS.__getitem__, rows) if entry_id is not None]
+    else:
+        lo, hi = driver["bounds"]
+        ids = {entry_id for _, entry_id in _LENGTH_INDEX[lo:hi]}
+
+    residual = None
+    for step in rest:
+        if "ids" in step and isinstance(ids, list):
+            step["access"] = "probe"
+            members = step["ids"]
+            ids = [entry_id for entry_id in ids if entry_id in members]
+        elif "ids" in step:
+            step["access"] = "intersect"
+            # Set intersection iterates the smaller side, so this is O(len(ids)).
+            ids = ids & step["ids"]
+        elif "columns" in step:
+            step["access"] = "probe"
+            mask = _COLUMNS.mask(**step["columns"])
+            ids = [entry_id for entry_id in ids if _row_in_mask(entry_id, mask)]
+        elif "bounds" in step:
+            step["access"] = "residual"
+            residual = step["value"]
+        elif "access" not in step:
+            step["access"] = "probe"
+            probes.append(step["bitmap"])
+
+    if probes:
+        ids = [entry_id for entry_id in ids if _row_in_all(entry_id, probes)]
+    if residual is not None:
+        min_length, max_length = residual
+        ids = [
+            entry_id for entry_id in ids
+            if entry_id is not None and _length_matches(_lookup(entry_id), min_length, max_length)
+        ]
+    # Sets iterate in hash order, which changes between processes; order by
+    # row instead. Ids deleted since they were read have no row and drop out.
+    return sorted(row for row in map(_ROW_OF.get, ids) if row is not None)
+
+
+def _row_in_mask(entry_id: bytes, mask) -> bool:
+    row = _ROW_OF.get(entry_id)
+    return row is not None and row < len(mask) and bool(mask[row])
+
+
+def _row_in_all(entry_id: bytes, bitmaps: List[Bitmap]) -> bool:
+    row = _ROW_OF.get(entry_id)
+    return row is not None and all(row in bm for bm in bitmaps)
+
+
+def _length_matches(entry: Optional[StringRecord], min_length: Optional[int], max_length: Optional[int]) -> bool:
+    return entry is not None and _entry_matches(entry, None, min_length, max_length, None, None)
+
+
+def _cached_rows(filters: Tuple) -> Tuple[int, ...]:
+    """Return the rows matching ``filters`` in ascending order, from the
+    result cache when still current."""
+    version = _VERSION
+    rows = _RESULT_CACHE.get(filters, version)
+    if rows is None:
+        rows = tuple(_execute(_plan(*filters)))
+        _RESULT_CACHE.put(filters, version, rows)
+    return rows
+
+
+def cache_metrics() -> Dict:
+    return {"enabled": True, "version": _VERSION, **_RESULT_CACHE.metrics()}
+
+
+def _page(matches: Optional[Sequence[int]], limit: int, after: Optional[int]) -> Tuple[List[StringRecord], Optional[int]]:
+    """Return up to ``limit`` entries with row > ``after`` in insertion order,
+    plus the row to resume after (None on the last page). ``matches`` are
+    ascending rows, or None for every entry."""
+    start = -1 if after is None else after
+    if matches is None:
+        # Walk the row table directly: O(page size + deleted rows skipped).
+        rows = []
+        row = start + 1
+        while row < len(_ROWS) and len(rows) <= limit:
+            if _ROWS[row] is not None:
+                rows.append(row)
+            row += 1
+    else:
+        # Matches are ascending, so the page starts at a binary search for the cursor.
+        i = bisect_right(matches, start)
+        rows = matches[i:i + limit + 1]
+    next_after = rows[limit - 1] if len(rows) > limit else None
+    # An entry deleted since its row was picked is dropped from the page.
+    entries = (_lookup(entry_id) for entry_id in map(_ROWS.__getitem__, rows[:limit]) if entry_id is not None)
+    return [entry for entry in entries if entry is not None], next_after
+
+
+def query(is_palindrome: Optional[bool] = None, min_length: Optional[int] = None, max_length: Optional[int] = None, word_count: Optional[int] = None, contains_character: Optional[str] = None, limit: Optional[int] = None, after: Optional[int] = None, explain: bool = False) -> Dict:
+    """Run a filtered listing.
+
+    Returns ``data`` (the matching entries, or one page of them when
+    ``limit`` is given), ``count`` (total matches, taken from the index
+    cardinality), ``next_after`` (row to pass as ``after`` for the next page)
+    and, with ``explain``, the chosen ``plan`` and its timing.
+    """
+    if contains_character is not None and len(contains_character) != 1:
+        raise ValueError("contains_character must be a single character")
+    filters = (is_palindrome, min_length, max_length, word_count, contains_character)
+    filtered = any(f is not None for f in filters)
+    started = time.perf_counter()
+    steps = _plan(*filters) if explain else []
+    planned = time.perf_counter()
+    if not filtered:
+        # No id list: pages walk the row table and the count is the store size.
+        count = _count()
+        if limit is None:
+            data, next_after = list(_iter_rows(None)), None
+        else:
+            data, next_after = _page(None, limit, after)
+    else:
+        rows = _execute(steps) if explain else _cached_rows(filters)
+        count = len(rows)
+        if limit is None:
+            data, next_after = list(_iter_rows(rows)), None
+        else:
+            data, next_after = _page(rows, limit, after)
+    finished = time.perf_counter()
+
+    result = {"data": data, "count": count, "next_after": next_after}
+    if explain:
+        result["plan"] = {
+            "steps": [
+                {"index": s["index"], "value": s["value"], "estimated_rows": s["estimated_rows"], "access": s["access"]}
+                for s in steps
+            ] or [{"index": None, "value": None, "estimated_rows": _count(), "access": "scan"}],
+            "total_rows": _count(),
+            "rows": count,
+            "timing_ms": {
+                "plan": round((planned - started) * 1000, 3),
+                "execute": round((finished - planned) * 1000, 3),
+            },
+        }
+    return result
+
+
+def iter_entries(is_palindrome: Optional[bool] = None, min_length: Optional[int] = None, max_length: Optional[int] = None, word_count: Optional[int] = None, contains_character: Optional[str] = None) -> Iterator[StringRecord]:
+    """Yield matching entries one at a time instead of building a list.
+
+    Filters are validated and planned eagerly so errors surface before the
+    first entry. An unfiltered listing walks the row table in insertion
+    order; a filtered one snapshots only the matching rows, then looks each
+    entry up as it is consumed. Entries deleted mid-stream are skipped.
+    """
+    if contains_character is not None and len(contains_character) != 1:
+        raise ValueError("contains_character must be a single character")
+    filters = (is_palindrome, min_length, max_length, word_count, contains_character)
+    rows = _cached_rows(filters) if any(f is not None for f in filters) else None
+    return _iter_rows(rows)
+
+
+def _iter_rows(rows: Optional[Iterable[int]]) -> Iterator[StringRecord]:
+    """Yield the live entries at ``rows`` (None: every row), skipping deleted ones."""
+    if rows is None:
+        row = 0
+        while row < len(_ROWS):
+            entry_id = _ROWS[row]
+            row += 1
+            entry = _lookup(entry_id) if entry_id is not None else None
+            if entry is not None:
+                yield entry
+        return
+    for entry_id in map(_ROWS.__getitem__, rows):
+        entry = _lookup(entry_id) if entry_id is not None else None
+        if entry is not None:
+            yield entry
+
+
+def filter_entries(is_palindrome: Optional[bool] = None, min_length: Optional[int] = None, max_length: Optional[int] = None, word_count: Optional[int] = None, contains_character: Optional[str] = None) -> List[StringRecord]:
+    return query(is_palindrome, min_length, max_length, word_count, contains_character)["data"]
+
+
+def explain_filter(is_palindrome: Optional[bool] = None, min_length: Optional[int] = None, max_length: Optional[int] = None, word_count: Optional[int] = None, contains_character: Optional[str] = None) -> Tuple[List[StringRecord], Dict]:
+    """Like filter_entries, but also return the chosen plan and its timing."""
+    result = query(is_palindrome, min_length, max_length, word_count, contains_character, explain=True)
+    return result["data"], result["plan"]
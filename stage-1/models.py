@@ -1,39 +1,184 @@
-from typing import Dict
+from typing import Any, Dict, FrozenSet, Optional
 from hashlib import sha256
-from collections import Counter
-from datetime import datetime, timezone
+from functools import lru_cache
+import os
+from datetime import datetime, timedelta, timezone
+import analyzer
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+_FREQ_CACHE_SIZE = int(os.getenv("FREQ_MAP_CACHE_SIZE", "4096"))
 
 
 def compute_sha256(value: str) -> str:
     return sha256(value.encode("utf-8")).hexdigest()
 
 
-def analyze_string(value: str) -> Dict:
-    length = len(value)
-  
-    cleaned = ''.join(c.lower() for c in value if c.isalnum())
-    is_palindrome = cleaned == cleaned[::-1] if cleaned else False
-    unique_characters = len(set(value))
-    word_count = 0
-    if value.strip():
-        word_count = len(value.split())
-    sha = compute_sha256(value)
-    freq_map = dict(Counter(value))
-
-    return {
-        "length": length,
-        "is_palindrome": is_palindrome,
-        "unique_characters": unique_characters,
-        "word_count": word_count,
-        "sha256_hash": sha,
-        "character_frequency_map": freq_map,
-    }
-
-
-def make_entry(value: str, properties: Dict) -> Dict:
-    return {
-        "id": properties["sha256_hash"],
-        "value": value,
-        "properties": properties,
-        "created_at": datetime.now(timezone.utc).isoformat(),
-    }
+def compute_digest(value: str) -> bytes:
+    """Binary SHA-256 of ``value``; the store's key (32 bytes instead of 64 hex chars)."""
+    return sha256(value.encode("utf-8")).digest()
+
+
+@lru_cache(maxsize=_FREQ_CACHE_SIZE)
+def frequency_map(value: str) -> Dict[str, int]:
+    """Character counts of ``value``, memoized for the most recently used values.
+
+    The returned dict is shared with the cache and must not be mutated.
+    """
+    return analyzer.frequency_map(value)
+
+
+def frequency_cache_metrics() -> Dict:
+    info = frequency_map.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+
+
+def analyze_string(value: str, digest: Optional[bytes] = None) -> Dict:
+    """Compute the stored properties of ``value``.
+
+    Pass ``digest`` when the caller already hashed the value so it is not
+    hashed again. The character frequency map is not part of the result; it is
+    derived on demand by ``frequency_map`` when a response asks for it.
+    """
+    properties = analyzer.analyze(value)
+    properties["sha256_hash"] = (digest if digest is not None else compute_digest(value)).hex()
+    return properties
+
+
+PROPERTY_FIELDS = ("length", "is_palindrome", "unique_characters", "word_count", "sha256_hash", "character_frequency_map")
+ENTRY_FIELDS = ("id", "value", "properties", "created_at")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[FrozenSet[str]]:
+    """Parse a ``fields=`` projection such as ``"id,value,properties.length"``.
+
+    Top-level names select whole fields (``properties`` selects every
+    property); ``properties.<name>`` selects a single property. Return None
+    for "all fields"; raise ValueError on unknown names.
+    """
+    if fields is None:
+        return None
+    selected = set()
+    for name in fields.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name in ENTRY_FIELDS:
+            selected.add(name)
+        elif name.startswith("properties.") and name[len("properties."):] in PROPERTY_FIELDS:
+            selected.add(name)
+        else:
+            raise ValueError(f"Unknown field: {name}")
+    if not selected:
+        raise ValueError("fields must name at least one field")
+    return frozenset(selected)
+
+
+# Every field except the frequency map, which is derived on demand.
+STORED_FIELDS = parse_fields(
+    "id,value,created_at," + ",".join("properties." + name for name in PROPERTY_FIELDS if name != "character_frequency_map")
+)
+
+
+class StringRecord:
+    """Compact stored form of an analyzed string.
+
+    Only what cannot be derived cheaply is kept: the binary digest, the value,
+    the palindrome flag, the word and unique character counts, and
+    ``created_at`` as integer microseconds since the epoch. ``length`` is
+    derived, and the character frequency map is computed lazily through the
+    bounded ``frequency_map`` cache. ``to_dict`` builds the API/JSON form;
+    ``encoded`` holds its JSON bytes once ``entry_json`` has produced them.
+    """
+
+    __slots__ = ("digest", "value", "is_palindrome", "word_count", "unique_characters", "created_us", "encoded")
+
+    def __init__(self, digest: bytes, value: str, is_palindrome: bool, word_count: int, unique_characters: int, created_us: int) -> None:
+        self.digest = digest
+        self.value = value
+        self.is_palindrome = is_palindrome
+        self.word_count = word_count
+        self.unique_characters = unique_characters
+        self.created_us = created_us
+        self.encoded: Optional[bytes] = None
+
+    @property
+    def id(self) -> str:
+        return self.digest.hex()
+
+    @property
+    def length(self) -> int:
+        return len(self.value)
+
+    @property
+    def created_at(self) -> str:
+        return (_EPOCH + self.created_us * _MICROSECOND).isoformat()
+
+    def frequency_map(self) -> Dict[str, int]:
+        return frequency_map(self.value)
+
+    def _property(self, name: str) -> Any:
+        if name == "sha256_hash":
+            return self.id
+        if name == "character_frequency_map":
+            return self.frequency_map()
+        return getattr(self, name)
+
+    def to_dict(self, fields: Optional[FrozenSet[str]] = None) -> Dict:
+        """Return the API/JSON form, restricted to ``fields`` (see ``parse_fields``)."""
+        if fields is None:
+            entry_id = self.id
+            return {
+                "id": entry_id,
+                "value": self.value,
+                "properties": {
+                    "length": self.length,
+                    "is_palindrome": self.is_palindrome,
+                    "unique_characters": self.unique_characters,
+                    "word_count": self.word_count,
+                    "sha256_hash": entry_id,
+                    "character_frequency_map": self.frequency_map(),
+                },
+                "created_at": self.created_at,
+            }
+        result: Dict[str, Any] = {}
+        if "id" in fields:
+            result["id"] = self.id
+        if "value" in fields:
+            result["value"] = self.value
+        if "properties" in fields:
+            result["properties"] = {name: self._property(name) for name in PROPERTY_FIELDS}
+        else:
+            properties = {name: self._property(name) for name in PROPERTY_FIELDS if "properties." + name in fields}
+            if properties:
+                result["properties"] = properties
+        if "created_at" in fields:
+            result["created_at"] = self.created_at
+        return result
+
+    @classmethod
+    def from_dict(cls, entry: Dict) -> "StringRecord":
+        p = entry["properties"]
+        created = datetime.fromisoformat(entry["created_at"])
+        return cls(
+            bytes.fromhex(entry["id"]),
+            entry["value"],
+            p["is_palindrome"],
+            p["word_count"],
+            p["unique_characters"],
+            (created - _EPOCH) // _MICROSECOND,
+        )
+
+
+def make_entry(value: str, properties: Dict) -> StringRecord:
+    return StringRecord(
+        bytes.fromhex(properties["sha256_hash"]),
+        value,
+        properties["is_palindrome"],
+        properties["word_count"],
+        properties["unique_characters"],
+        (datetime.now(timezone.utc) - _EPOCH) // _MICROSECOND,
+    )
@@ -1,9 +1,25 @@
 from typing import Optional, Dict
+from functools import lru_cache
+import os
 import re
 
+_PARSE_CACHE_SIZE = int(os.getenv("PARSE_CACHE_SIZE", "1024"))
+
 
 def parse(query: str) -> Optional[Dict]:
-    q = query.lower().strip()
+    """Parse a natural language query into filters, memoized by normalized query."""
+    filters = _parse_normalized(query.lower().strip())
+    # The memoized dict is shared; hand each caller its own copy.
+    return dict(filters) if filters is not None else None
+
+
+def parse_cache_metrics() -> Dict:
+    info = _parse_normalized.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+
+
+@lru_cache(maxsize=_PARSE_CACHE_SIZE)
+def _parse_normalized(q: str) -> Optional[Dict]:
     filters = {}
 
     # Examples: "all single word palindromic strings"
@@ -0,0 +1,46 @@
+from typing import Any, Dict, Hashable, Optional
+from collections import OrderedDict
+import threading
+
+
+class ResultCache:
+    """LRU cache of query results tagged with the store version they were computed at.
+
+    The store bumps its version on every write, so ``get`` treats an entry
+    from an older version as a miss and drops it; nothing has to be
+    invalidated eagerly. Callers must read the version *before* computing a
+    result, so a write that races with the computation makes it stale rather
+    than wrongly fresh.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            if cached is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, version: int, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "max_size": self.max_size}
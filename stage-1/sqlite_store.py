@@ -0,0 +1,339 @@
+"""SQLite storage backend.
+
+Each analyzed property is an indexed column and a ``string_chars`` side
+table indexes which characters a value contains. The character frequency
+map is not stored; records derive it on demand. Filters are pushed down into SQL. The database runs in WAL
+mode so several uvicorn workers can share one file: readers never block the
+single writer.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import os
+import sqlite3
+import threading
+import time
+import models
+from models import StringRecord
+
+DB_PATH = os.getenv("STORE_SQLITE_PATH", "strings.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS strings (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id BLOB NOT NULL UNIQUE,
+    value TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    is_palindrome INTEGER NOT NULL,
+    unique_characters INTEGER NOT NULL,
+    word_count INTEGER NOT NULL,
+    created_us INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_strings_length ON strings(length);
+CREATE INDEX IF NOT EXISTS ix_strings_word_count ON strings(word_count);
+CREATE INDEX IF NOT EXISTS ix_strings_is_palindrome ON strings(is_palindrome);
+CREATE TABLE IF NOT EXISTS string_chars (
+    ch TEXT NOT NULL,
+    seq INTEGER NOT NULL REFERENCES strings(seq) ON DELETE CASCADE,
+    PRIMARY KEY (ch, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_string_chars_seq ON string_chars(seq);
+CREATE TABLE IF NOT EXISTS counters (
+    kind TEXT NOT NULL,
+    key NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS tr_strings_count_insert AFTER INSERT ON strings BEGIN
+    INSERT INTO counters VALUES
+        ('palindrome', NEW.is_palindrome, 1), ('length', NEW.length, 1),
+        ('word_count', NEW.word_count, 1), ('total_length', 0, NEW.length)
+    ON CONFLICT (kind, key) DO UPDATE SET n = n + excluded.n;
+END;
+CREATE TRIGGER IF NOT EXISTS tr_strings_count_delete AFTER DELETE ON strings BEGIN
+    INSERT INTO counters VALUES
+        ('palindrome', OLD.is_palindrome, -1), ('length', OLD.length, -1),
+        ('word_count', OLD.word_count, -1), ('total_length', 0, -OLD.length)
+    ON CONFLICT (kind, key) DO UPDATE SET n = n + excluded.n;
+END;
+CREATE TRIGGER IF NOT EXISTS tr_string_chars_count_insert AFTER INSERT ON string_chars BEGIN
+    INSERT INTO counters VALUES ('char', NEW.ch, 1) ON CONFLICT (kind, key) DO UPDATE SET n = n + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS tr_string_chars_count_delete AFTER DELETE ON string_chars BEGIN
+    UPDATE counters SET n = n - 1 WHERE kind = 'char' AND key = OLD.ch;
+END;
+"""
+
+# Rebuilds the counters from scratch, for databases created before they existed.
+_REBUILD_COUNTERS = """
+DELETE FROM counters;
+INSERT INTO counters SELECT 'palindrome', is_palindrome, COUNT(*) FROM strings GROUP BY is_palindrome;
+INSERT INTO counters SELECT 'length', length, COUNT(*) FROM strings GROUP BY length;
+INSERT INTO counters SELECT 'word_count', word_count, COUNT(*) FROM strings GROUP BY word_count;
+INSERT INTO counters SELECT 'total_length', 0, COALESCE(SUM(length), 0) FROM strings;
+INSERT INTO counters SELECT 'char', ch, COUNT(*) FROM string_chars GROUP BY ch;
+"""
+
+_COLUMNS = "seq, id, value, is_palindrome, word_count, unique_characters, created_us"
+
+_local = threading.local()
+_connections: List[sqlite3.Connection] = []
+_connections_lock = threading.Lock()
+
+
+def _connect(check_same_thread: bool = True) -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, isolation_level=None, check_same_thread=check_same_thread)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _conn() -> sqlite3.Connection:
+    """Return this thread's connection, opening it on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _connect()
+        _local.conn = conn
+        with _connections_lock:
+            _connections.append(conn)
+    return conn
+
+
+def _row_to_entry(row: Tuple) -> StringRecord:
+    _, digest, value, is_palindrome, word_count, unique_characters, created_us = row
+    return StringRecord(digest, value, bool(is_palindrome), word_count, unique_characters, created_us)
+
+
+def open_storage() -> Dict:
+    conn = _conn()
+    (count,) = conn.execute("SELECT COUNT(*) FROM strings").fetchone()
+    if count != _counter_total(conn):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in _REBUILD_COUNTERS.strip().split(";\n"):
+                conn.execute(statement)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    return {"enabled": True, "backend": "sqlite", "path": DB_PATH, "count": count}
+
+
+def close_storage() -> None:
+    with _connections_lock:
+        for conn in _connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Owned by another thread; it is closed when that thread exits.
+                pass
+        _connections.clear()
+    _local.__dict__.clear()
+
+
+def exists(value: str, digest: Optional[bytes] = None) -> bool:
+    if digest is None:
+        digest = models.compute_digest(value)
+    return _conn().execute("SELECT 1 FROM strings WHERE id = ?", (digest,)).fetchone() is not None
+
+
+_INSERT = (
+    "INSERT INTO strings (id, value, length, is_palindrome, unique_characters, word_count, created_us)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO NOTHING"
+)
+
+
+def _insert(conn: sqlite3.Connection, entry: StringRecord) -> bool:
+    """Insert ``entry`` and its character rows; return False if it already exists."""
+    cur = conn.execute(_INSERT, (
+        entry.digest, entry.value, entry.length, int(entry.is_palindrome), entry.unique_characters,
+        entry.word_count, entry.created_us,
+    ))
+    if not cur.rowcount:
+        return False
+    seq = cur.lastrowid
+    conn.executemany("INSERT INTO string_chars (ch, seq) VALUES (?, ?)", ((ch, seq) for ch in set(entry.value)))
+    return True
+
+
+def create_entry(value: str, properties: Dict) -> Optional[StringRecord]:
+    """Insert ``value`` unless it already exists; return None if it does."""
+    entry = models.make_entry(value, properties)
+    conn = _conn()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        inserted = _insert(conn, entry)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return entry if inserted else None
+
+
+def create_many(items: Iterable[Tuple[str, Dict]]) -> List[Optional[StringRecord]]:
+    """Insert analyzed ``(value, properties)`` pairs in one transaction.
+
+    Return the new record for each item, or None where the value already
+    exists (including earlier in the same batch).
+    """
+    entries = [models.make_entry(value, properties) for value, properties in items]
+    conn = _conn()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        results = [entry if _insert(conn, entry) else None for entry in entries]
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return results
+
+
+def get_by_value(value: str) -> Optional[StringRecord]:
+    digest = models.compute_digest(value)
+    row = _conn().execute(f"SELECT {_COLUMNS} FROM strings WHERE id = ?", (digest,)).fetchone()
+    return _row_to_entry(row) if row else None
+
+
+def delete_by_value(value: str) -> bool:
+    digest = models.compute_digest(value)
+    cur = _conn().execute("DELETE FROM strings WHERE id = ?", (digest,))
+    return cur.rowcount > 0
+
+
+def _where(is_palindrome: Optional[bool], min_length: Optional[int], max_length: Optional[int], word_count: Optional[int], contains_character: Optional[str]) -> Tuple[str, List]:
+    if contains_character is not None and len(contains_character) != 1:
+        raise ValueError("contains_character must be a single character")
+    clauses, params = [], []
+    if is_palindrome is not None:
+        clauses.append("is_palindrome = ?")
+        params.append(int(is_palindrome))
+    if min_length is not None:
+        clauses.append("length >= ?")
+        params.append(min_length)
+    if max_length is not None:
+        clauses.append("length <= ?")
+        params.append(max_length)
+    if word_count is not None:
+        clauses.append("word_count = ?")
+        params.append(word_count)
+    if contains_character is not None:
+        clauses.append("seq IN (SELECT seq FROM string_chars WHERE ch = ?)")
+        params.append(contains_character)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def query(is_palindrome: Optional[bool] = None, min_length: Optional[int] = None, max_length: Optional[int] = None, word_count: Optional[int] = None, contains_character: Optional[str] = None, limit: Optional[int] = None, after: Optional[int] = None, explain: bool = False) -> Dict:
+    """Same contract as memory_store.query; ``after`` is the last ``seq`` seen."""
+    where, params = _where(is_palindrome, min_length, max_length, word_count, contains_character)
+    conn = _conn()
+    started = time.perf_counter()
+    (count,) = conn.execute(f"SELECT COUNT(*) FROM strings{where}", params).fetchone()
+
+    sql = f"SELECT {_COLUMNS} FROM strings{where}"
+    page_params = list(params)
+    if after is not None:
+        sql += (" AND" if where else " WHERE") + " seq > ?"
+        page_params.append(after)
+    sql += " ORDER BY seq"
+    if limit is not None:
+        sql += " LIMIT ?"
+        page_params.append(limit + 1)
+    rows = conn.execute(sql, page_params).fetchall()
+    next_after = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_after = rows[-1][0]
+    finished = time.perf_counter()
+
+    result = {"data": [_row_to_entry(row) for row in rows], "count": count, "next_after": next_after}
+    if explain:
+        steps = conn.execute(f"EXPLAIN QUERY PLAN {sql}", page_params).fetchall()
+        result["plan"] = {
+            "backend": "sqlite",
+            "sql": sql,
+            "steps": [detail for *_, detail in steps],
+            "rows": count,
+            "timing_ms": {"execute": round((finished - started) * 1000, 3)},
+        }
+    return result
+
+
+def iter_entries(is_palindrome: Optional[bool] = None, min_length: Optional[int] = None, max_length: Optional[int] = None, word_count: Optional[int] = None, contains_character: Optional[str] = None) -> Iterator[StringRecord]:
+    """Yield matching entries in insertion order straight from a SQL cursor."""
+    where, params = _where(is_palindrome, min_length, max_length, word_count, contains_character)
+    return _iter_rows(f"SELECT {_COLUMNS} FROM strings{where} ORDER BY seq", params)
+
+
+def _iter_rows(sql: str, params: List) -> Iterator[StringRecord]:
+    # A streaming response may resume this generator on different worker
+    # threads, so it uses its own connection rather than the thread-local one.
+    conn = _connect(check_same_thread=False)
+    try:
+        cur = conn.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(500)
+            if not rows:
+                break
+            for row in rows:
+                yield _row_to_entry(row)
+    finally:
+        conn.close()
+
+
+def filter_entries(is_palindrome: Optional[bool] = None, min_length: Optional[int] = None, max_length: Optional[int] = None, word_count: Optional[int] = None, contains_character: Optional[str] = None) -> List[StringRecord]:
+    return query(is_palindrome, min_length, max_length, word_count, contains_character)["data"]
+
+
+def explain_filter(is_palindrome: Optional[bool] = None, min_length: Optional[int] = None, max_length: Optional[int] = None, word_count: Optional[int] = None, contains_character: Optional[str] = None) -> Tuple[List[StringRecord], Dict]:
+    """Like filter_entries, but also return SQLite's query plan and timing."""
+    result = query(is_palindrome, min_length, max_length, word_count, contains_character, explain=True)
+    return result["data"], result["plan"]
+
+
+def _counter_total(conn: sqlite3.Connection) -> int:
+    (total,) = conn.execute("SELECT COALESCE(SUM(n), 0) FROM counters WHERE kind = 'palindrome'").fetchone()
+    return total
+
+
+def stats(top_characters: int = 10) -> Dict:
+    """Aggregates for /stats/strings, read from the ``counters`` table that
+    triggers keep up to date on every insert and delete."""
+    conn = _conn()
+    counters: Dict[str, Dict] = {"palindrome": {}, "length": {}, "word_count": {}, "total_length": {}}
+    for kind, key, n in conn.execute("SELECT kind, key, n FROM counters WHERE kind != 'char' AND n != 0 ORDER BY kind, key"):
+        counters[kind][key] = n
+    top = conn.execute(
+        "SELECT key, n FROM counters WHERE kind = 'char' AND n > 0 ORDER BY n DESC, key LIMIT ?", (top_characters,)
+    ).fetchall()
+    total = sum(counters["palindrome"].values())
+    palindromes = counters["palindrome"].get(1, 0)
+    return {
+        "total": total,
+        "palindromes": palindromes,
+        "palindrome_ratio": palindromes / total if total else 0.0,
+        "average_length": counters["total_length"].get(0, 0) / total if total else 0.0,
+        "length_histogram": counters["length"],
+        "word_count_histogram": counters["word_count"],
+        "top_characters": [{"character": ch, "strings": n} for ch, n in top],
+    }
+
+
+def cache_metrics() -> Dict:
+    # Other processes write to the same file, so there is no local version to
+    # validate cached results against; SQLite's page cache serves repeats.
+    return {"enabled": False}
+
+
+def statistics() -> Dict:
+    conn = _conn()
+    return {
+        "total": conn.execute("SELECT COUNT(*) FROM strings").fetchone()[0],
+        "length_histogram": dict(conn.execute("SELECT length, COUNT(*) FROM strings GROUP BY length ORDER BY length")),
+        "palindrome": {
+            "true" if pal else "false": n
+            for pal, n in conn.execute("SELECT is_palindrome, COUNT(*) FROM strings GROUP BY is_palindrome")
+        },
+        "word_count": dict(conn.execute("SELECT word_count, COUNT(*) FROM strings GROUP BY word_count ORDER BY word_count")),
+        "characters": dict(conn.execute("SELECT ch, COUNT(*) FROM string_chars GROUP BY ch ORDER BY ch")),
+    }
@@ -0,0 +1,334 @@
+"""Durable storage for the in-memory store: write-ahead log plus snapshots.
+
+Every create/delete is appended to ``wal.log`` as one JSON line tagged with a
+log sequence number (LSN) before it is applied in memory. Every
+``STORE_SNAPSHOT_EVERY`` operations the log is rotated to ``wal.prev.log``
+and a background thread writes the whole store to ``snapshot.ndjson`` (temp
+file, fsync, rename), then deletes the rotated segment. On shutdown the
+snapshot is written inline and both segments are truncated.
+
+Recovery memory-maps the snapshot, loads it, then replays ``wal.prev.log``
+and ``wal.log``, skipping records not newer than the LSN already applied. A
+torn final log line from a crash is discarded, and a log whose last record
+lost its newline gets one back before anything is appended. Persistence is
+off unless ``STORE_DATA_DIR`` is set.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+
+logger = logging.getLogger("stage1.storage")
+
+DATA_DIR = os.getenv("STORE_DATA_DIR", "")
+SNAPSHOT_EVERY = int(os.getenv("STORE_SNAPSHOT_EVERY", "10000"))
+FSYNC = os.getenv("STORE_FSYNC", "true").lower() in ("1", "true", "yes")
+
+SNAPSHOT_NAME = "snapshot.ndjson"
+WAL_NAME = "wal.log"
+PREV_WAL_NAME = "wal.prev.log"
+_FORMAT_VERSION = 1
+
+_wal = None
+_lsn = 0
+_ops_since_snapshot = 0
+_snapshot_thread: Optional[threading.Thread] = None
+
+
+def enabled() -> bool:
+    return bool(DATA_DIR)
+
+
+def _path(name: str) -> str:
+    return os.path.join(DATA_DIR, name)
+
+
+def _fsync_dir() -> None:
+    fd = os.open(DATA_DIR, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _load_snapshot(apply_create: Callable[[Dict], None]) -> int:
+    """Load the snapshot via mmap. Return its LSN (0 if there is none)."""
+    path = _path(SNAPSHOT_NAME)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return 0
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header = json.loads(mm.readline())
+        if header.get("version") != _FORMAT_VERSION:
+            raise RuntimeError(f"Unsupported snapshot version in {path}: {header.get('version')}")
+        for line in iter(mm.readline, b""):
+            apply_create(json.loads(line))
+    return header["lsn"]
+
+
+_decoder = json.JSONDecoder()
+
+
+def _decode_line(line: bytes) -> Tuple[List[Dict], int]:
+    """Decode the records on one log line and return them with the number of
+    bytes they span; anything after that did not decode.
+
+    A line normally holds one record. Logs written before the tail repair in
+    _replay_wal existed can hold several records joined on one line.
+    Records are ASCII (json.dumps escapes the rest), so latin-1 keeps
+    character offsets equal to byte offsets.
+    """
+    text = line.decode("latin-1")
+    records: List[Dict] = []
+    end = 0
+    while True:
+        while end < len(text) and text[end] in " \t\r\n":
+            end += 1
+        if end == len(text):
+            return records, len(line)
+        try:
+            record, stop = _decoder.raw_decode(text, end)
+        except ValueError:
+            return records, end
+        if not isinstance(record, dict):
+            return records, end
+        records.append(record)
+        end = stop
+
+
+def _repair_tail(path: str, end: int) -> None:
+    """Cut the log at ``end`` and make sure it ends with a newline, so the next
+    appended record starts on a line of its own."""
+    with open(path, "r+b") as fh:
+        fh.truncate(end)
+        if end:
+            fh.seek(end - 1)
+            if fh.read(1) != b"\n":
+                fh.write(b"\n")
+                fh.flush()
+                os.fsync(fh.fileno())
+
+
+def _replay_wal(name: str, after_lsn: int, apply_create: Callable[[Dict], None], apply_delete: Callable[[str], None]) -> int:
+    """Replay records of log segment ``name`` newer than ``after_lsn``. Return the last LSN seen.
+
+    Bytes that do not decode at the very end of the log are a torn write
+    and are cut off. Undecodable bytes followed by more lines are skipped
+    with a warning, and replay continues with the records after them.
+    """
+    path = _path(name)
+    last_lsn = after_lsn
+    if not os.path.exists(path):
+        return last_lsn
+    offset = 0
+    torn_at: Optional[int] = None
+    with open(path, "rb") as fh:
+        for line in fh:
+            if torn_at is not None:
+                logger.warning("Skipping corrupt record at offset %s of %s", torn_at, path)
+                torn_at = None
+            records, consumed = _decode_line(line)
+            if consumed < len(line):
+                torn_at = offset + consumed
+            offset += len(line)
+            for record in records:
+                last_lsn = max(last_lsn, record["lsn"])
+                if record["lsn"] <= after_lsn:
+                    continue
+                if record["op"] == "create":
+                    apply_create(record["entry"])
+                elif record["op"] == "delete":
+                    apply_delete(record["id"])
+    if torn_at is not None:
+        logger.warning("Discarding torn record at offset %s of %s", torn_at, path)
+        _repair_tail(path, torn_at)
+    elif offset:
+        _repair_tail(path, offset)
+    return last_lsn
+
+
+def recover(apply_create: Callable[[Dict], None], apply_delete: Callable[[str], None]) -> Dict:
+    """Rebuild state from disk and open the log for appending.
+
+    ``apply_create`` receives a stored entry dict, ``apply_delete`` an entry id.
+    """
+    global _wal, _lsn, _ops_since_snapshot
+    if not enabled():
+        return {"enabled": False}
+    os.makedirs(DATA_DIR, exist_ok=True)
+    for name in os.listdir(DATA_DIR):
+        if name.startswith(".snapshot.") and name.endswith(".tmp"):
+            # An unfinished snapshot from a crash; the log still covers it.
+            os.unlink(_path(name))
+    snapshot_lsn = _load_snapshot(apply_create)
+    # A rotated segment is left behind if the process died during a background snapshot.
+    _lsn = _replay_wal(PREV_WAL_NAME, snapshot_lsn, apply_create, apply_delete)
+    _lsn = _replay_wal(WAL_NAME, _lsn, apply_create, apply_delete)
+    _ops_since_snapshot = _lsn - snapshot_lsn
+    _wal = open(_path(WAL_NAME), "ab")
+    stats = {"enabled": True, "snapshot_lsn": snapshot_lsn, "replayed": _ops_since_snapshot, "lsn": _lsn}
+    logger.info("Recovered store from %s: %s", DATA_DIR, stats)
+    return stats
+
+
+def _append(records: Iterable[Dict]) -> None:
+    """Append ``records`` to the log with one flush (and fsync) for all of them."""
+    global _lsn, _ops_since_snapshot
+    if _wal is None:
+        return
+    for record in records:
+        _lsn += 1
+        record["lsn"] = _lsn
+        _wal.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+        _ops_since_snapshot += 1
+    _wal.flush()
+    if FSYNC:
+        os.fsync(_wal.fileno())
+
+
+def log_create(entry: Dict) -> None:
+    _append(({"op": "create", "entry": entry},))
+
+
+def log_creates(entries: Iterable[Dict]) -> None:
+    _append({"op": "create", "entry": entry} for entry in entries)
+
+
+def log_delete(entry_id: str) -> None:
+    _append(({"op": "delete", "id": entry_id},))
+
+
+def snapshot_due() -> bool:
+    return _wal is not None and _ops_since_snapshot >= SNAPSHOT_EVERY and not snapshot_running()
+
+
+def snapshot_running() -> bool:
+    return _snapshot_thread is not None and _snapshot_thread.is_alive()
+
+
+def _write_snapshot_file(entries: Iterable[Dict], lsn: int) -> int:
+    """Atomically replace the snapshot with ``entries`` as of ``lsn``. Return the entry count."""
+    fd, tmp_path = tempfile.mkstemp(prefix=".snapshot.", suffix=".tmp", dir=DATA_DIR)
+    try:
+        count = 0
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(json.dumps({"version": _FORMAT_VERSION, "lsn": lsn}).encode() + b"\n")
+            for entry in entries:
+                fh.write(json.dumps(entry, separators=(",", ":")).encode() + b"\n")
+                count += 1
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, _path(SNAPSHOT_NAME))
+        _fsync_dir()
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return count
+
+
+def _rotate_wal() -> None:
+    """Move the records logged so far into ``wal.prev.log`` and start an empty ``wal.log``."""
+    global _wal, _ops_since_snapshot
+    _wal.close()
+    prev_path = _path(PREV_WAL_NAME)
+    if os.path.exists(prev_path):
+        # Left over from a crashed or failed snapshot: it is still needed, so append to it.
+        with open(prev_path, "ab") as dst, open(_path(WAL_NAME), "rb") as src:
+            shutil.copyfileobj(src, dst)
+            dst.flush()
+            os.fsync(dst.fileno())
+        _wal = open(_path(WAL_NAME), "wb")
+    else:
+        os.replace(_path(WAL_NAME), prev_path)
+        _wal = open(_path(WAL_NAME), "ab")
+    if FSYNC:
+        _fsync_dir()
+    _ops_since_snapshot = 0
+
+
+def _finish_snapshot(entries: Iterable[Dict], lsn: int) -> None:
+    try:
+        count = _write_snapshot_file(entries, lsn)
+    except Exception:
+        # wal.prev.log is kept, so nothing is lost; the next snapshot retries.
+        logger.exception("Background snapshot at lsn %s failed", lsn)
+        return
+    # Records up to lsn are now in the snapshot. A crash before this unlink
+    # is harmless because replay skips them by LSN.
+    try:
+        os.unlink(_path(PREV_WAL_NAME))
+    except FileNotFoundError:
+        pass
+    logger.info("Wrote snapshot of %s entries at lsn %s", count, lsn)
+
+
+def start_snapshot(entries: Iterable[Dict]) -> Optional[int]:
+    """Rotate the log and write ``entries`` as the new snapshot on a background thread.
+
+    The caller must hold the store's write lock, and ``entries`` must
+    reflect exactly the operations up to the current LSN even when consumed
+    after the lock is released (e.g. a generator over copied records).
+    Return that LSN.
+    """
+    global _snapshot_thread
+    if _wal is None:
+        return None
+    lsn = _lsn
+    _rotate_wal()
+    _snapshot_thread = threading.Thread(target=_finish_snapshot, args=(entries, lsn), name="snapshot", daemon=True)
+    _snapshot_thread.start()
+    return lsn
+
+
+def wait_for_snapshot() -> None:
+    if _snapshot_thread is not None:
+        _snapshot_thread.join()
+
+
+def write_snapshot(entries: Iterable[Dict]) -> Optional[int]:
+    """Write ``entries`` as the new snapshot inline and truncate the log.
+
+    The caller must hold the store's write lock so ``entries`` reflects
+    exactly the operations up to the current LSN. Return that LSN.
+    """
+    global _wal, _ops_since_snapshot
+    if _wal is None:
+        return None
+    wait_for_snapshot()
+    count = _write_snapshot_file(entries, _lsn)
+    # See _finish_snapshot: replay skips anything already in the snapshot.
+    _wal.close()
+    _wal = open(_path(WAL_NAME), "wb")
+    try:
+        os.unlink(_path(PREV_WAL_NAME))
+    except FileNotFoundError:
+        pass
+    _ops_since_snapshot = 0
+    logger.info("Wrote snapshot of %s entries at lsn %s", count, _lsn)
+    return _lsn
+
+
+def close() -> None:
+    global _wal
+    wait_for_snapshot()
+    if _wal is not None:
+        _wal.close()
+        _wal = None
+
+
+def status() -> Dict:
+    return {
+        "enabled": enabled(),
+        "data_dir": DATA_DIR or None,
+        "lsn": _lsn,
+        "ops_since_snapshot": _ops_since_snapshot,
+        "snapshot_every": SNAPSHOT_EVERY,
+        "snapshot_running": snapshot_running(),
+        "fsync": FSYNC,
+    }
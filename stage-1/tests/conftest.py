@@ -0,0 +1,100 @@
+"""
+Pytest configuration and fixtures.
+
+The store and its storage layer keep module-level state and read their
+settings from the environment at import time, so fixtures set the
+environment and reload the modules to get a fresh store.
+"""
+
+import importlib
+
+import pytest
+
+import db
+import memory_store
+import sqlite_store
+import storage
+
+
+def _reload_store():
+    importlib.reload(storage)
+    return importlib.reload(memory_store)
+
+
+def _memory_store(engine, monkeypatch):
+    if engine == "columnar":
+        pytest.importorskip("numpy")
+    monkeypatch.setenv("STORE_DATA_DIR", "")
+    monkeypatch.setenv("STORE_ENGINE", engine)
+    return _reload_store()
+
+
+def _sqlite_store(monkeypatch, tmp_path):
+    monkeypatch.setenv("STORE_SQLITE_PATH", str(tmp_path / "strings.db"))
+    module = importlib.reload(sqlite_store)
+    module.open_storage()
+    yield module
+    module.close_storage()
+
+
+@pytest.fixture(params=["index", "columnar", "sqlite"])
+def store(request, monkeypatch, tmp_path):
+    """Fresh store for each backend: in-memory without persistence, once per
+    planner engine, and SQLite on a database file in ``tmp_path``."""
+    if request.param == "sqlite":
+        yield from _sqlite_store(monkeypatch, tmp_path)
+    else:
+        yield _memory_store(request.param, monkeypatch)
+
+
+@pytest.fixture
+def sqlite(monkeypatch, tmp_path):
+    """Fresh SQLite store on a database file in ``tmp_path``."""
+    yield from _sqlite_store(monkeypatch, tmp_path)
+
+
+@pytest.fixture(params=["index", "columnar"])
+def memory(request, monkeypatch):
+    """Fresh in-memory store without persistence, for each planner engine."""
+    yield _memory_store(request.param, monkeypatch)
+
+
+@pytest.fixture
+def durable(monkeypatch, tmp_path):
+    """Factory for a store persisted in ``tmp_path``.
+
+    Each call simulates a process start: it reloads the modules (dropping
+    whatever the previous instance held in memory, like a crash would) and
+    recovers from disk. The open log is closed at teardown.
+    """
+    monkeypatch.setenv("STORE_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("STORE_FSYNC", "false")
+    monkeypatch.setenv("STORE_ENGINE", "index")
+
+    def start(snapshot_every=10000):
+        storage.close()
+        monkeypatch.setenv("STORE_SNAPSHOT_EVERY", str(snapshot_every))
+        module = _reload_store()
+        module.open_storage()
+        return module
+
+    yield start
+    storage.close()
+    monkeypatch.setenv("STORE_DATA_DIR", "")
+    _reload_store()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """TestClient for the app on a fresh in-memory store without persistence."""
+    from fastapi.testclient import TestClient
+
+    import app
+
+    monkeypatch.setenv("STORE_DATA_DIR", "")
+    monkeypatch.setenv("STORE_BACKEND", "memory")
+    monkeypatch.setenv("STORE_ENGINE", "index")
+    _reload_store()
+    importlib.reload(db)
+    with TestClient(app.app) as test_client:
+        yield test_client
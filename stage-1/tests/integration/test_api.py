@@ -0,0 +1,148 @@
+"""
+Integration tests for the string API endpoints.
+"""
+
+import base64
+import json
+
+import app
+import workers
+
+
+def _cursor(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def test_cursor_pages_through_listing(client):
+    for value in ("a", "bb", "ccc"):
+        assert client.post("/strings", json={"value": value}).status_code == 201
+
+    first = client.get("/strings", params={"limit": 2}).json()
+    assert [e["value"] for e in first["data"]] == ["a", "bb"]
+    second = client.get("/strings", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    assert [e["value"] for e in second["data"]] == ["ccc"]
+    assert second["next_cursor"] is None
+
+
+def test_negative_cursor_is_rejected(client):
+    client.post("/strings", json={"value": "a"})
+    for raw in ("row:-1", "row:-100"):
+        response = client.get("/strings", params={"limit": 10, "cursor": _cursor(raw)})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_malformed_cursor_is_rejected(client):
+    for raw in ("page:1", "row:x", "row"):
+        response = client.get("/strings", params={"limit": 10, "cursor": _cursor(raw)})
+        assert response.status_code == 400
+
+
+def test_stats_do_not_shadow_stored_value(client):
+    for value in ("stats", "hello"):
+        assert client.post("/strings", json={"value": value}).status_code == 201
+
+    entry = client.get("/strings/stats")
+    assert entry.status_code == 200
+    assert entry.json()["value"] == "stats"
+
+    stats = client.get("/stats/strings").json()
+    assert stats["total"] == 2
+    assert stats["palindromes"] == 1
+    assert client.delete("/strings/stats").status_code == 204
+    stats = client.get("/stats/strings").json()
+    assert (stats["total"], stats["palindromes"]) == (1, 0)
+
+
+def _batch(client, items):
+    response = client.post("/strings/batch", json=items)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_batch_reports_each_item(client, monkeypatch):
+    """Test every item gets its own status, in order, with matching totals."""
+    monkeypatch.setattr(workers, "MAX_VALUE_LENGTH", 8)
+    assert client.post("/strings", json={"value": "taken"}).status_code == 201
+
+    body = _batch(client, [
+        "level", {"value": "hello world"[:8]}, "taken", 42, {"value": None},
+        {"value": "x", "extra": 1}, "way too long", "level", {"value": "level"},
+    ])
+
+    assert [r["status"] for r in body["results"]] == [201, 201, 409, 422, 400, 422, 413, 409, 409]
+    created = body["results"][0]["data"]
+    assert created["value"] == "level"
+    assert created["properties"]["is_palindrome"] is True
+    assert created["properties"]["character_frequency_map"] == {"l": 2, "e": 2, "v": 1}
+    assert body["results"][1]["data"]["properties"]["word_count"] == 2
+    assert body["results"][2] == {"status": 409, "detail": "String already exists", "value": "taken"}
+    assert body["results"][6]["detail"] == '"value" exceeds 8 characters'
+    assert (body["created"], body["conflicts"], body["invalid"]) == (2, 3, 4)
+    assert client.get("/strings/level").json() == created
+
+
+def test_batch_duplicates_within_one_batch(client):
+    """Test only the first copy of a value repeated in a batch is created."""
+    body = _batch(client, ["abc", "abc", {"value": "abc"}, "def"])
+
+    assert [r["status"] for r in body["results"]] == [201, 409, 409, 201]
+    assert (body["created"], body["conflicts"], body["invalid"]) == (2, 2, 0)
+    assert client.get("/strings").json()["count"] == 2
+
+
+def test_batch_accepts_ndjson(client):
+    """Test an NDJSON upload is read one item per line, skipping blank lines."""
+    lines = [json.dumps("noon"), "", json.dumps({"value": "two words"}), json.dumps(7), json.dumps("noon")]
+    response = client.post(
+        "/strings/batch",
+        content="\n".join(lines).encode() + b"\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["status"] for r in body["results"]] == [201, 201, 422, 409]
+    assert (body["created"], body["conflicts"], body["invalid"]) == (2, 1, 1)
+
+
+def test_batch_rejects_invalid_body(client):
+    """Test a body that is not a JSON array is rejected as a whole."""
+    assert client.post("/strings/batch", content=b"[1,", headers={"Content-Type": "application/json"}).status_code == 400
+    assert client.post("/strings/batch", json={"value": "a"}).status_code == 400
+    assert client.post(
+        "/strings/batch", content=b'"ok"\n{bad\n', headers={"Content-Type": "application/x-ndjson"}
+    ).status_code == 400
+
+
+def test_batch_item_limit(client, monkeypatch):
+    """Test batches over BATCH_MAX_ITEMS get 413 and create nothing."""
+    monkeypatch.setattr(app, "BATCH_MAX_ITEMS", 3)
+
+    assert _batch(client, ["a", "b", "c"])["created"] == 3
+    response = client.post("/strings/batch", json=["d", "e", "f", "g"])
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Batch exceeds 3 items"
+    ndjson = client.post("/strings/batch", content=b'"d"\n"e"\n"f"\n"g"\n', headers={"Content-Type": "application/x-ndjson"})
+    assert ndjson.status_code == 413
+    assert client.get("/strings").json()["count"] == 3
+
+
+def test_batch_body_limit(client, monkeypatch):
+    """Test bodies over BATCH_MAX_BYTES get 413, whether or not they declare a length."""
+    monkeypatch.setattr(app, "BATCH_MAX_BYTES", 32)
+    payload = json.dumps(["a" * 10, "b" * 10, "c" * 10]).encode()
+    assert len(payload) > 32
+
+    declared = client.post("/strings/batch", content=payload, headers={"Content-Type": "application/json"})
+    assert declared.status_code == 413
+    assert declared.json()["detail"] == "Batch body exceeds 32 bytes"
+
+    def chunked():
+        yield payload[:16]
+        yield payload[16:]
+
+    streamed = client.post("/strings/batch", content=chunked(), headers={"Content-Type": "application/json"})
+    assert streamed.status_code == 413
+    assert _batch(client, ["a" * 10, "b" * 10])["created"] == 2
+    assert client.get("/strings").json()["count"] == 2
@@ -0,0 +1,86 @@
+"""
+Unit tests for the fused analyzer against the original implementation.
+"""
+
+import random
+import string
+from collections import Counter
+
+import pytest
+
+import analyzer
+
+
+def _legacy_analyze(value):
+    """The original Counter/str implementation the analyzer replaced."""
+    cleaned = ''.join(c.lower() for c in value if c.isalnum())
+    return {
+        "length": len(value),
+        "is_palindrome": cleaned == cleaned[::-1] if cleaned else False,
+        "unique_characters": len(set(value)),
+        "word_count": len(value.split()) if value.strip() else 0,
+    }
+
+
+_rng = random.Random(1234)
+
+VALUES = [
+    "",
+    "a",
+    " ",
+    "A man, a plan, a canal: Panama",
+    "hello world",
+    "  leading and trailing  ",
+    "Was it a car or a cat I saw?",
+    "!!!",
+    "12321",
+    "tab\tseparated\nlines\r\nand\x0bvertical\x0cfeed",
+    "unit\x1fsep\x1erecord\x1dgroup\x1cfile",
+    "\x1c\x1d\x1e\x1f",
+    "x\x1fx",
+    "\x00\x7f control",
+    "Ésope reste ici et se repose",
+    "été",
+    "non breaking spaces",
+    "ünïcödé ÜNÏCÖDÉ",
+    "日本語 テキスト",
+    "Ⅻ ⅻ",
+    "naïve\x1fcafé",
+    "😀 emoji 😀",
+    "".join(_rng.choices(string.printable, k=5000)),
+    "".join(_rng.choices(string.ascii_letters + " \x1c\x1d\x1e\x1f", k=5000)),
+    "".join(_rng.choices("ab", k=2000)) + "".join(_rng.choices("ab", k=2000))[::-1],
+    "".join(_rng.choices("aé b\x1f", k=3000)),
+]
+
+
+@pytest.fixture(params=["default", "numpy"])
+def path(request, monkeypatch):
+    """Run each case with the default thresholds, and once more with the
+    NumPy path taken for every ASCII value."""
+    if request.param == "numpy":
+        if analyzer.np is None:
+            pytest.skip("NumPy is not installed")
+        monkeypatch.setattr(analyzer, "NUMPY_MIN_LENGTH", 1)
+    return request.param
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_analyze_matches_original(path, value):
+    """Test every analyzer path returns the original properties."""
+    assert analyzer.analyze(value) == _legacy_analyze(value)
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_frequency_map_matches_counter(path, value):
+    """Test the frequency map has the Counter's counts in first-occurrence order."""
+    assert list(analyzer.frequency_map(value).items()) == list(Counter(value).items())
+
+
+def test_palindrome_of_mirrored_ascii(path):
+    """Test a long mirrored value with punctuation is a palindrome on every path."""
+    half = "".join(_rng.choices(string.ascii_letters + string.punctuation + " ", k=10000))
+    value = half + half[::-1]
+
+    assert analyzer.analyze(value)["is_palindrome"] is True
+    assert analyzer.analyze(value + "!x")["is_palindrome"] is _legacy_analyze(value + "!x")["is_palindrome"]
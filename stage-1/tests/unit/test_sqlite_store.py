@@ -0,0 +1,85 @@
+"""
+Unit tests for the SQLite store: the character side table, the counters
+kept by triggers and their rebuild on startup.
+"""
+
+import importlib
+
+import models
+import sqlite_store
+
+
+def _create(store, *values):
+    for value in values:
+        assert store.create_entry(value, models.analyze_string(value)) is not None
+
+
+def _rows(store, sql):
+    return store._conn().execute(sql).fetchall()
+
+
+def _counters(store):
+    return sorted(_rows(store, "SELECT kind, key, n FROM counters WHERE n != 0"))
+
+
+def test_delete_cascades_to_string_chars(sqlite):
+    """Test deleting a string removes its character rows and their counts."""
+    _create(sqlite, "abc", "bcd")
+
+    assert sqlite.delete_by_value("abc")
+
+    assert sorted(_rows(sqlite, "SELECT ch FROM string_chars")) == [("b",), ("c",), ("d",)]
+    assert sqlite.statistics()["characters"] == {"b": 1, "c": 1, "d": 1}
+    assert [e.value for e in sqlite.iter_entries(contains_character="a")] == []
+    assert sqlite.stats()["top_characters"] == [
+        {"character": "b", "strings": 1},
+        {"character": "c", "strings": 1},
+        {"character": "d", "strings": 1},
+    ]
+
+
+def test_triggers_keep_counters_in_step(sqlite):
+    """Test inserts, batch inserts and deletes update the counters table."""
+    _create(sqlite, "noon", "ab c")
+    created = sqlite.create_many([(v, models.analyze_string(v)) for v in ("xy", "noon", "xy")])
+    assert [e.value if e else None for e in created] == ["xy", None, None]
+    assert sqlite.delete_by_value("ab c")
+
+    assert _counters(sqlite) == [
+        ("char", "n", 1), ("char", "o", 1), ("char", "x", 1), ("char", "y", 1),
+        ("length", 2, 1), ("length", 4, 1),
+        ("palindrome", 0, 1), ("palindrome", 1, 1),
+        ("total_length", 0, 6),
+        ("word_count", 1, 2),
+    ]
+
+
+def test_open_storage_rebuilds_missing_counters(sqlite, monkeypatch):
+    """Test a database whose counters are out of step is repaired on startup."""
+    _create(sqlite, "level", "hello world", "abc")
+    assert sqlite.delete_by_value("abc")
+    expected = _counters(sqlite)
+    # Like a database written before the counters table existed.
+    sqlite._conn().execute("DELETE FROM counters")
+    sqlite.close_storage()
+
+    restarted = importlib.reload(sqlite_store)
+    assert restarted.open_storage()["count"] == 2
+
+    assert _counters(restarted) == expected
+    assert restarted.stats()["total"] == 2
+
+
+def test_cursor_is_the_insertion_sequence(sqlite):
+    """Test next_after is the seq of the last row, and seqs are not reused after deletes."""
+    _create(sqlite, "a", "b", "c")
+    first = sqlite.query(limit=2)
+    assert first["next_after"] == 2
+    assert sqlite.delete_by_value("c")
+    _create(sqlite, "d")
+
+    second = sqlite.query(limit=2, after=first["next_after"])
+
+    assert [e.value for e in second["data"]] == ["d"]
+    assert _rows(sqlite, "SELECT seq FROM strings WHERE value = 'd'") == [(4,)]
+    assert second["next_after"] is None
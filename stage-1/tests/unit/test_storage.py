@@ -0,0 +1,165 @@
+"""
+Unit tests for write-ahead log replay and snapshot recovery.
+"""
+
+import json
+import os
+
+import models
+import storage
+
+
+def _create(store, *values):
+    for value in values:
+        assert store.create_entry(value, models.analyze_string(value)) is not None
+
+
+def _values(store):
+    return [entry.value for entry in store._iter_rows(None)]
+
+
+def test_recovery_replays_log_in_order(durable):
+    """Test creates and deletes are replayed from the log after a restart."""
+    store = durable()
+    _create(store, "alpha", "beta", "gamma")
+    assert store.delete_by_value("beta")
+
+    store = durable()
+
+    assert _values(store) == ["alpha", "gamma"]
+    assert storage.status()["lsn"] == 4
+
+
+def test_recovery_discards_torn_tail(durable, tmp_path):
+    """Test a partially written last record is dropped and truncated away."""
+    store = durable()
+    _create(store, "alpha", "beta")
+    wal = tmp_path / storage.WAL_NAME
+    good_size = wal.stat().st_size
+    with open(wal, "ab") as fh:
+        fh.write(b'{"op":"create","entry":{"id":"ab')
+
+    store = durable()
+
+    assert _values(store) == ["alpha", "beta"]
+    assert wal.stat().st_size == good_size
+    _create(store, "gamma")
+    assert _values(durable()) == ["alpha", "beta", "gamma"]
+
+
+def test_recovery_restores_missing_final_newline(durable, tmp_path):
+    """Test a complete last record without its newline is kept and later records start a new line."""
+    store = durable()
+    _create(store, "a", "b", "c")
+    wal = tmp_path / storage.WAL_NAME
+    wal.write_bytes(wal.read_bytes().rstrip(b"\n"))
+
+    store = durable()
+    _create(store, "d", "e")
+    store = durable()
+
+    assert _values(store) == ["a", "b", "c", "d", "e"]
+    assert storage.status()["lsn"] == 5
+
+
+def test_recovery_splits_records_joined_on_one_line(durable, tmp_path):
+    """Test records appended onto an unterminated line by older versions are all replayed."""
+    store = durable()
+    _create(store, "a", "b", "c")
+    wal = tmp_path / storage.WAL_NAME
+    lines = wal.read_bytes().splitlines(keepends=True)
+    wal.write_bytes(lines[0] + lines[1].rstrip(b"\n") + lines[2])
+
+    store = durable()
+
+    assert _values(store) == ["a", "b", "c"]
+    assert storage.status()["lsn"] == 3
+
+
+def test_recovery_skips_corrupt_record_mid_log(durable, tmp_path):
+    """Test an undecodable line followed by more records does not end replay."""
+    store = durable()
+    _create(store, "a", "b")
+    wal = tmp_path / storage.WAL_NAME
+    lines = wal.read_bytes().splitlines(keepends=True)
+    wal.write_bytes(lines[0] + b"garbage\n" + lines[1])
+
+    store = durable()
+
+    assert _values(store) == ["a", "b"]
+    assert storage.status()["lsn"] == 2
+
+
+def test_recovery_skips_records_covered_by_snapshot(durable, tmp_path):
+    """Test log records at or below the snapshot LSN are not applied again."""
+    store = durable()
+    _create(store, "alpha")
+    with store._WRITE_LOCK:
+        assert storage.write_snapshot(store._snapshot_entries()) == 1
+    stale = models.make_entry("stale", models.analyze_string("stale")).to_dict(models.STORED_FIELDS)
+    fresh = models.make_entry("fresh", models.analyze_string("fresh")).to_dict(models.STORED_FIELDS)
+    storage.close()
+    # As if the process died before truncating the log after the snapshot.
+    with open(tmp_path / storage.WAL_NAME, "wb") as fh:
+        fh.write(json.dumps({"op": "create", "entry": stale, "lsn": 1}).encode() + b"\n")
+        fh.write(json.dumps({"op": "create", "entry": fresh, "lsn": 2}).encode() + b"\n")
+
+    store = durable()
+
+    assert _values(store) == ["alpha", "fresh"]
+    assert storage.status()["lsn"] == 2
+
+
+def test_recovery_replays_rotated_segment(durable, tmp_path):
+    """Test records in a rotated log whose background snapshot never finished are recovered."""
+    store = durable()
+    _create(store, "alpha", "beta")
+    with store._WRITE_LOCK:
+        storage._rotate_wal()
+    _create(store, "gamma")
+
+    store = durable()
+
+    assert (tmp_path / storage.PREV_WAL_NAME).exists()
+    assert _values(store) == ["alpha", "beta", "gamma"]
+    # The next rotation appends to the leftover segment instead of replacing it.
+    with store._WRITE_LOCK:
+        storage._rotate_wal()
+    _create(store, "delta")
+    assert _values(durable()) == ["alpha", "beta", "gamma", "delta"]
+
+
+def test_background_snapshot_truncates_log(durable, tmp_path):
+    """Test a due snapshot is written in the background and replaces the rotated log."""
+    store = durable(snapshot_every=3)
+    _create(store, "alpha", "beta", "gamma", "delta")
+    storage.wait_for_snapshot()
+
+    assert not (tmp_path / storage.PREV_WAL_NAME).exists()
+    with open(tmp_path / storage.SNAPSHOT_NAME, "rb") as fh:
+        assert json.loads(fh.readline())["lsn"] == 3
+    assert _values(durable()) == ["alpha", "beta", "gamma", "delta"]
+
+
+def test_recovery_rebuilds_sorted_length_index(durable):
+    """Test the length index is sorted after recovery, including replaced and deleted entries."""
+    store = durable()
+    _create(store, "ccc", "a", "bb", "dddd")
+    assert store.delete_by_value("bb")
+
+    store = durable()
+
+    assert store._LENGTH_INDEX == sorted(store._LENGTH_INDEX)
+    assert len(store._LENGTH_INDEX) == 3
+    assert [e.value for e in store.query(min_length=2)["data"]] == ["ccc", "dddd"]
+
+
+def test_recovery_removes_stale_snapshot_temp_files(durable, tmp_path):
+    """Test a temp file left by an interrupted snapshot is deleted on startup."""
+    durable()
+    leftover = tmp_path / ".snapshot.abc.tmp"
+    leftover.write_bytes(b"partial")
+
+    durable()
+
+    assert not os.path.exists(leftover)
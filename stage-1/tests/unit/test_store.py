@@ -0,0 +1,161 @@
+"""
+Unit tests for the store backends.
+
+Tests taking ``store`` run against the in-memory store (under each planner
+engine) and the SQLite store; tests taking ``memory`` cover behaviour
+specific to the in-memory store.
+"""
+
+import models
+
+
+def _create(store, *values):
+    for value in values:
+        assert store.create_entry(value, models.analyze_string(value)) is not None
+
+
+def _pages(store, limit, **filters):
+    after, pages = None, []
+    while True:
+        result = store.query(**filters, limit=limit, after=after)
+        pages.append([entry.value for entry in result["data"]])
+        after = result["next_after"]
+        if after is None:
+            return pages
+
+
+def test_create_is_insert_if_absent(store):
+    """Test creating an existing value returns None and keeps the first entry."""
+    first = store.create_entry("noon", models.analyze_string("noon"))
+
+    assert store.create_entry("noon", models.analyze_string("noon")) is None
+    kept = store.get_by_value("noon")
+    assert (kept.digest, kept.created_us) == (first.digest, first.created_us)
+    assert store.query()["count"] == 1
+
+
+def test_filtered_listing_follows_insertion_order(store):
+    """Test filtered results come back in insertion order, not hash or length order."""
+    values = [f"abc{i}" for i in (14, 3, 12, 150, 1, 15)]
+    _create(store, *values)
+
+    assert [e.value for e in store.query(contains_character="a")["data"]] == values
+    assert [e.value for e in store.query(min_length=4, word_count=1)["data"]] == values
+    assert [e.value for e in store.iter_entries(contains_character="1")] == [v for v in values if "1" in v]
+
+
+def test_cursor_pagination_across_deletes(store):
+    """Test deletes between pages neither repeat nor skip surviving entries."""
+    values = [f"item {i}" for i in range(20)]
+    _create(store, *values)
+
+    first = store.query(word_count=2, limit=5)
+    assert [e.value for e in first["data"]] == values[:5]
+    # Delete the cursor row itself, one row on the next page, and a later one.
+    for value in ("item 4", "item 6", "item 17"):
+        assert store.delete_by_value(value)
+    second = store.query(word_count=2, limit=5, after=first["next_after"])
+
+    assert [e.value for e in second["data"]] == ["item 5", "item 7", "item 8", "item 9", "item 10"]
+    assert second["count"] == 17
+
+
+def test_pagination_covers_each_entry_once(store):
+    """Test filtered and unfiltered page walks return every live entry exactly once."""
+    values = [f"v{i}" + "a" * (i % 4) for i in range(50)]
+    _create(store, *values)
+    for value in values[::7]:
+        assert store.delete_by_value(value)
+    live = [v for v in values if v not in values[::7]]
+
+    assert sum(_pages(store, 6), []) == live
+    assert sum(_pages(store, 6, contains_character="a"), []) == [v for v in live if "a" in v]
+    assert sum(_pages(store, 4, min_length=3, max_length=4), []) == [v for v in live if 3 <= len(v) <= 4]
+
+
+def test_unfiltered_count_comes_from_store_size(store):
+    """Test an unfiltered page reports the total number of entries."""
+    _create(store, "a", "b", "c")
+
+    result = store.query(limit=2)
+
+    assert result["count"] == 3
+    assert len(result["data"]) == 2
+
+
+def test_delete_during_bitmap_scan_is_skipped(memory, monkeypatch):
+    """Test a row deleted after the driving bitmap was copied is dropped, not a 500."""
+    _create(memory, "racecar", "noon", "level up", "abc")
+    iter_rows = memory.iter_rows
+
+    def delete_then_iterate(bits):
+        memory.delete_by_value("noon")
+        return iter_rows(bits)
+
+    monkeypatch.setattr(memory, "iter_rows", delete_then_iterate)
+    # Force the bitmap path even under the columnar engine.
+    monkeypatch.setattr(memory, "_COLUMNS", None)
+
+    assert [e.value for e in memory.query(is_palindrome=True)["data"]] == ["racecar"]
+    _create(memory, "noon")
+    assert [e.value for e in memory.query(is_palindrome=True, min_length=1, word_count=1)["data"]] == ["racecar"]
+
+
+def test_iteration_skips_entries_deleted_mid_stream(memory):
+    """Test a streamed listing skips entries deleted after it started."""
+    _create(memory, "one", "two", "three")
+    stream = memory.iter_entries(min_length=3)
+
+    assert next(stream).value == "one"
+    assert memory.delete_by_value("two")
+    assert [e.value for e in stream] == ["three"]
+
+
+def test_query_during_write_is_not_cached_as_current(memory, monkeypatch):
+    """Test a result computed while a write updates the indexes is not served after it."""
+    _create(memory, "noon", "abc")
+    seen = []
+
+    class QueryMidWrite(dict):
+        def __setitem__(self, key, value):
+            super().__setitem__(key, value)
+            seen.append([e.value for e in memory.query(is_palindrome=True)["data"]])
+
+    monkeypatch.setattr(memory, "_LENGTH_HISTOGRAM", QueryMidWrite(memory._LENGTH_HISTOGRAM))
+    _create(memory, "level")
+
+    assert seen == [["noon"]]
+    assert [e.value for e in memory.query(is_palindrome=True)["data"]] == ["noon", "level"]
+
+
+def test_stats_follow_creates_and_deletes(store):
+    """Test stats drop deleted entries from every counter and histogram."""
+    _create(store, "level", "noon", "hello world", "abc", "lol")
+    for value in ("noon", "abc"):
+        assert store.delete_by_value(value)
+
+    stats = store.stats(top_characters=100)
+    top = {item["character"]: item["strings"] for item in stats.pop("top_characters")}
+
+    assert stats == {
+        "total": 3,
+        "palindromes": 2,
+        "palindrome_ratio": 2 / 3,
+        "average_length": 19 / 3,
+        "length_histogram": {3: 1, 5: 1, 11: 1},
+        "word_count_histogram": {1: 2, 2: 1},
+    }
+    assert top == {"l": 3, "e": 2, "o": 2, "v": 1, "h": 1, "w": 1, "r": 1, "d": 1, " ": 1}
+    assert store.stats(top_characters=1)["top_characters"] == [{"character": "l", "strings": 3}]
+
+    for value in ("level", "hello world", "lol"):
+        assert store.delete_by_value(value)
+    assert store.stats() == {
+        "total": 0,
+        "palindromes": 0,
+        "palindrome_ratio": 0.0,
+        "average_length": 0.0,
+        "length_histogram": {},
+        "word_count_histogram": {},
+        "top_characters": [],
+    }
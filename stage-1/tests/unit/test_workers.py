@@ -0,0 +1,55 @@
+"""
+Unit tests for the analysis process pool.
+"""
+
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import models
+import workers
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Two-worker pool, shut down after the test."""
+    monkeypatch.setattr(workers, "ANALYZE_WORKERS", 2)
+    monkeypatch.setattr(workers, "BATCH_PARALLEL_MIN", 2)
+    monkeypatch.setattr(workers, "BATCH_CHUNK_SIZE", 1)
+    yield
+    workers.shutdown()
+
+
+def _kill_a_worker():
+    with pytest.raises(BrokenProcessPool):
+        workers._get_pool().submit(os._exit, 1).result()
+
+
+def test_offloaded_analysis_recovers_from_dead_worker(pool):
+    """Test a dead worker fails the in-flight call once, then a new pool serves."""
+    value = "never odd or even"
+    digest = models.compute_digest(value)
+    _kill_a_worker()
+
+    with pytest.raises(BrokenProcessPool):
+        asyncio.run(workers.analyze_offloaded(value, digest))
+    properties, frequency_map = asyncio.run(workers.analyze_offloaded(value, digest))
+
+    assert properties == models.analyze_string(value, digest)
+    assert frequency_map == models.frequency_map(value)
+
+
+def test_batch_analysis_recovers_from_dead_worker(pool):
+    """Test parallel batch analysis replaces a broken pool."""
+    values = ["abc", "level", "two words"]
+    digests = [models.compute_digest(value) for value in values]
+    _kill_a_worker()
+
+    with pytest.raises(BrokenProcessPool):
+        asyncio.run(workers.analyze_many(values, digests))
+
+    assert asyncio.run(workers.analyze_many(values, digests)) == [
+        models.analyze_string(value, digest) for value, digest in zip(values, digests)
+    ]
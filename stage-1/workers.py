@@ -0,0 +1,145 @@
+"""Process pool for CPU-bound string analysis.
+
+Analysis holds the GIL, so large batches are split into chunks and fanned out
+to a ``ProcessPoolExecutor`` with ``ANALYZE_WORKERS`` processes (default: one
+per CPU). Batches smaller than ``BATCH_PARALLEL_MIN`` values, or a pool of
+fewer than two workers, are analyzed on the caller's thread pool instead,
+where pickling overhead would outweigh the parallelism.
+
+A single value of at least ``OFFLOAD_MIN_LENGTH`` characters is also sent to
+the pool so it does not stall other requests. Its UTF-8 bytes are copied once
+into a shared memory segment that the worker reads in place, instead of being
+pickled through the pool's pipe. The worker returns the properties and the
+frequency map, and the caller waits at most ``ANALYZE_TIMEOUT`` seconds.
+
+The pool is created on first use and shut down with the app. If a worker
+dies (killed, out of memory, crashed) the pool is broken for good: the
+calls in flight raise ``BrokenProcessPool``, the pool is dropped, and the
+next call starts a new one.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+import asyncio
+import os
+import sys
+import threading
+
+from starlette.concurrency import run_in_threadpool
+
+import analyzer
+import models
+
+ANALYZE_WORKERS = int(os.getenv("ANALYZE_WORKERS", str(os.cpu_count() or 1)))
+BATCH_PARALLEL_MIN = int(os.getenv("BATCH_PARALLEL_MIN", "1000"))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "500"))
+OFFLOAD_MIN_LENGTH = int(os.getenv("ANALYZE_OFFLOAD_MIN_LENGTH", "262144"))
+MAX_VALUE_LENGTH = int(os.getenv("STRING_MAX_LENGTH", str(16 * 1024 * 1024)))
+ANALYZE_TIMEOUT = float(os.getenv("ANALYZE_TIMEOUT", "30"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=ANALYZE_WORKERS)
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget a broken ``pool`` so the next ``_get_pool`` builds a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def analyze_chunk(values: Sequence[str], digests: Sequence[bytes]) -> List[Dict]:
+    """Analyze ``values`` whose digests are already known (runs in a worker)."""
+    return [models.analyze_string(value, digest) for value, digest in zip(values, digests)]
+
+
+async def analyze_many(values: Sequence[str], digests: Sequence[bytes]) -> List[Dict]:
+    """Analyze ``values`` in order, in parallel when the batch is large enough.
+
+    Raise ``BrokenProcessPool`` if a worker died; the pool is replaced on the
+    next call.
+    """
+    if ANALYZE_WORKERS < 2 or len(values) < BATCH_PARALLEL_MIN:
+        return await run_in_threadpool(analyze_chunk, values, digests)
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    try:
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(pool, analyze_chunk, values[i:i + BATCH_CHUNK_SIZE], digests[i:i + BATCH_CHUNK_SIZE])
+            for i in range(0, len(values), BATCH_CHUNK_SIZE)
+        ))
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    return [properties for chunk in chunks for properties in chunk]
+
+
+def should_offload(value: str) -> bool:
+    return ANALYZE_WORKERS >= 1 and len(value) >= OFFLOAD_MIN_LENGTH
+
+
+def _attach(name: str) -> SharedMemory:
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    shm = SharedMemory(name=name)
+    # Attaching registers the segment with the resource tracker, which would
+    # unlink it when this worker exits; the request handler owns it.
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def analyze_shared(name: str, size: int, digest: bytes) -> Tuple[Dict, Dict[str, int]]:
+    """Analyze a UTF-8 value held in shared memory segment ``name`` (runs in a worker)."""
+    shm = _attach(name)
+    try:
+        with shm.buf[:size] as view:
+            value = str(view, "utf-8")
+    finally:
+        shm.close()
+    return models.analyze_string(value, digest), analyzer.frequency_map(value)
+
+
+async def analyze_offloaded(value: str, digest: bytes) -> Tuple[Dict, Dict[str, int]]:
+    """Analyze one large value on the process pool.
+
+    Return its properties and frequency map. Raise ``asyncio.TimeoutError``
+    after ``ANALYZE_TIMEOUT`` seconds; the worker cannot be interrupted and
+    finishes in the background. Raise ``BrokenProcessPool`` if a worker
+    died; the pool is replaced on the next call.
+    """
+    data = value.encode("utf-8")
+    size = len(data)
+    shm = SharedMemory(create=True, size=max(size, 1))
+    try:
+        shm.buf[:size] = data
+        del data
+        pool = _get_pool()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(pool, analyze_shared, shm.name, size, digest)
+            return await asyncio.wait_for(future, ANALYZE_TIMEOUT)
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            raise
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None